@@ -3,16 +3,157 @@ Audio Analysis Module
 Handles beat detection, energy envelope, onset detection, and frequency band analysis.
 """
 
+import os
 import subprocess
 import json
+import hashlib
+import functools
 import numpy as np
 import librosa
+import soundfile as sf
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import FrozenSet, Iterable, List, Tuple, Optional
 
+from disk_cache import PersistentCache
 
-# Cache for loaded audio to avoid reloading
-_audio_cache: dict = {}
+# numba ships with librosa; fall back to pure NumPy kernels if it's missing
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+# Analysis results are cached on disk (see disk_cache) so they survive process restarts.
+# Bump ANALYSIS_CACHE_VERSION whenever AudioFeatures or the analysis changes.
+ANALYSIS_CACHE_VERSION = 4
+
+# Read size when hashing a file's content for cache keys
+_FINGERPRINT_CHUNK_BYTES = 1024 * 1024
+# Bytes from the start of the file mixed into the cheap duration-cache key
+_DURATION_KEY_HEAD_BYTES = 64 * 1024
+
+
+def _file_fingerprint(audio_path: str) -> str:
+    """
+    Content-based cache key for a file: hash of its size and full contents.
+    Independent of the path and mtime, so re-uploads of the same file share
+    cache entries.
+    """
+    stat = os.stat(audio_path)
+    return _content_hash(os.path.abspath(audio_path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _content_hash(audio_path: str, size: int, mtime_ns: int) -> str:
+    """Hash a file's contents; memoized per (path, size, mtime) so unchanged files aren't re-read."""
+    digest = hashlib.sha1(f"{size}:".encode())
+    with open(audio_path, "rb") as f:
+        while chunk := f.read(_FINGERPRINT_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _duration_key(audio_path: str) -> str:
+    """
+    Cheap cache key for a file's duration: its size, mtime, and first bytes.
+    Avoids hashing the whole file on the upload path, where only the header is read.
+    """
+    stat = os.stat(audio_path)
+    digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}:".encode())
+    with open(audio_path, "rb") as f:
+        digest.update(f.read(_DURATION_KEY_HEAD_BYTES))
+    return digest.hexdigest()
+
+
+# Cached durations (keyed by _duration_key) and analysis results (keyed by file fingerprint)
+_duration_cache = PersistentCache("durations", maxsize=256, max_disk_bytes=4 * 1024 * 1024)
+_analysis_cache = PersistentCache("analysis", maxsize=32, max_disk_bytes=256 * 1024 * 1024)
+
+# STFT / mel configuration shared by all spectral features
+ANALYSIS_SAMPLE_RATE = 22050
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+
+# Optional analysis stages. Callers that only need some of them (e.g. a render
+# with no beat-reactive effects) can skip the rest; see analyze_audio(required=...)
+FEATURE_BEATS = "beats"    # beat_times / beat_strengths / tempo
+FEATURE_ONSETS = "onsets"  # onset_times / onset_strengths
+FEATURE_ENERGY = "energy"  # RMS energy envelope
+FEATURE_BANDS = "bands"    # bass/mid/high mel band envelopes
+DEFAULT_FEATURES: FrozenSet[str] = frozenset({FEATURE_BEATS, FEATURE_ONSETS, FEATURE_ENERGY, FEATURE_BANDS})
+
+# Frequency bands (bass: 0-300Hz, mid: 300-2000Hz, high: 2000Hz+) as approximate mel bin ranges
+BAND_MEL_RANGES = ((0, 20), (20, 80), (80, N_MELS))
+
+# Each row averages one band's mel bins, so _BAND_AGG @ mel gives all three bands in one pass
+_BAND_AGG = np.zeros((len(BAND_MEL_RANGES), N_MELS), dtype=np.float32)
+for _row, (_lo, _hi) in enumerate(BAND_MEL_RANGES):
+    _BAND_AGG[_row, _lo:_hi] = 1.0 / (_hi - _lo)
+del _row, _lo, _hi
+_BAND_RANGES_ARRAY = np.array(BAND_MEL_RANGES, dtype=np.int64)
+
+# Cache for mel filterbanks, keyed by (sr, n_fft, n_mels)
+_mel_basis_cache: dict = {}
+
+
+def _get_mel_basis(sr: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Get a (cached) mel filterbank matrix."""
+    key = (sr, n_fft, n_mels)
+    if key not in _mel_basis_cache:
+        _mel_basis_cache[key] = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+    return _mel_basis_cache[key]
+
+
+def _band_energies(mel_spec_db: np.ndarray) -> np.ndarray:
+    """
+    Min-max normalize a dB mel spectrogram and average it into frequency bands.
+    Returns a (n_bands, T) float32 array.
+    """
+    # Stay in float32 - the mel stage is memory-bound and float64 doubles its traffic
+    mel_spec_db = np.ascontiguousarray(mel_spec_db, dtype=np.float32)
+    mel_min = mel_spec_db.min()
+    scale = np.float32(1.0 / (mel_spec_db.max() - mel_min + 1e-6))
+    
+    if _band_energies_jit is not None:
+        return _band_energies_jit(mel_spec_db, np.float32(mel_min), scale, _BAND_RANGES_ARRAY)
+    
+    # Fallback without numba: one matmul against the band-averaging matrix. Each row
+    # of _BAND_AGG sums to 1, so normalizing the (n_bands, T) result is equivalent to
+    # normalizing the spectrogram first, without materializing a normalized copy.
+    bands = _BAND_AGG @ mel_spec_db
+    bands -= mel_min
+    bands *= scale
+    return bands
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _band_energies_jit(mel_spec_db, mel_min, scale, band_ranges):
+        """Fused normalize + band mean in a single pass over the mel matrix (no temporaries)."""
+        n_bands = band_ranges.shape[0]
+        n_frames = mel_spec_db.shape[1]
+        out = np.empty((n_bands, n_frames), dtype=np.float32)
+        for t in prange(n_frames):
+            for b in range(n_bands):
+                lo = band_ranges[b, 0]
+                hi = band_ranges[b, 1]
+                acc = np.float32(0.0)
+                for k in range(lo, hi):
+                    acc += mel_spec_db[k, t] - mel_min
+                out[b, t] = acc * scale / (hi - lo)
+        return out
+else:
+    _band_energies_jit = None
+
+
+def _strengths_at_frames(envelope: np.ndarray, frames: np.ndarray) -> np.ndarray:
+    """Look up envelope values at frame indices (0.5 for frames past the end) as float64."""
+    frames = np.asarray(frames, dtype=np.intp)
+    if len(envelope) == 0:
+        return np.full(len(frames), 0.5)
+    clipped = np.minimum(frames, len(envelope) - 1)
+    return np.where(frames < len(envelope), envelope[clipped], 0.5).astype(np.float64)
 
 
 @dataclass
@@ -21,14 +162,17 @@ class AudioFeatures:
     duration: float
     sample_rate: int
     tempo: float
-    beat_times: List[float]  # Times in seconds when beats occur
-    beat_strengths: List[float]  # Relative strength of each beat (0-1)
-    onset_times: List[float]  # Times of musical onsets/transients
-    onset_strengths: List[float]  # Strength of each onset
-    energy_envelope: List[Tuple[float, float]]  # (time, energy) pairs
-    bass_energy: List[Tuple[float, float]]  # Low frequency energy over time
-    mid_energy: List[Tuple[float, float]]  # Mid frequency energy over time
-    high_energy: List[Tuple[float, float]]  # High frequency energy over time
+    # Beat/onset events as parallel float64 arrays (.tolist() at the JSON boundary)
+    beat_times: np.ndarray  # Times in seconds when beats occur
+    beat_strengths: np.ndarray  # Relative strength of each beat (0-1)
+    onset_times: np.ndarray  # Times of musical onsets/transients
+    onset_strengths: np.ndarray  # Strength of each onset
+    # Per-frame envelopes stored as parallel float32 arrays sharing `times`
+    times: np.ndarray  # Frame times in seconds
+    energy_envelope: np.ndarray  # RMS energy per frame (0-1)
+    bass_energy: np.ndarray  # Low frequency energy per frame
+    mid_energy: np.ndarray  # Mid frequency energy per frame
+    high_energy: np.ndarray  # High frequency energy per frame
     
     # Computed metrics for AI interpretation (no BPM-based assumptions)
     onset_density: float = 0.0  # Onsets per second - indicates rhythmic activity
@@ -38,111 +182,184 @@ class AudioFeatures:
     dynamic_range: float = 0.0  # Difference between max and min energy
     beat_strength_variance: float = 0.0  # How much beat strengths vary
     average_energy: float = 0.0  # Overall average energy level
+    
+    def as_pairs(self, name: str) -> List[Tuple[float, float]]:
+        """Get an envelope (e.g. "bass_energy") as (time, value) pairs for serialization."""
+        return list(zip(self.times.tolist(), getattr(self, name).tolist()))
 
 
-def analyze_audio(audio_path: str, start_time: float = 0.0, duration: float = None) -> AudioFeatures:
+def analyze_audio(
+    audio_path: str,
+    start_time: float = 0.0,
+    duration: float = None,
+    required: Iterable[str] = DEFAULT_FEATURES,
+    use_cache: bool = True
+) -> AudioFeatures:
     """
     Analyze an audio file and extract beat-reactive features.
+    Results are memoized (in memory and on disk) by file identity and region,
+    so re-analyzing the same selection is nearly free.
     
     Args:
         audio_path: Path to the audio file
         start_time: Start time in seconds for analysis region
         duration: Duration in seconds to analyze (None = full file)
+        required: Feature stages to compute (subset of DEFAULT_FEATURES).
+                  Skipped stages come back as empty lists/arrays.
+        use_cache: If False, always recompute (the fresh result still replaces
+                   the cached entry)
     
     Returns:
-        AudioFeatures object containing all extracted features
+        AudioFeatures object containing all extracted features. It is shared
+        with the cache, so its arrays are read-only; copy them to modify.
     """
-    # Load audio file
-    y, sr = librosa.load(audio_path, sr=22050, offset=start_time, duration=duration)
-    actual_duration = len(y) / sr
-    
-    # Beat detection
-    tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
-    beat_times = librosa.frames_to_time(beat_frames, sr=sr).tolist()
+    required = frozenset(required) & DEFAULT_FEATURES
+    fingerprint = _file_fingerprint(audio_path)
+    key = _analysis_key(fingerprint, start_time, duration, required)
     
-    # Calculate beat strengths based on onset envelope at beat times
-    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-    onset_env_normalized = onset_env / (onset_env.max() + 1e-6)
-    
-    beat_strengths = []
-    for frame in beat_frames:
-        if frame < len(onset_env_normalized):
-            beat_strengths.append(float(onset_env_normalized[frame]))
-        else:
-            beat_strengths.append(0.5)
+    features = _analysis_cache.get(key) if use_cache else None
+    if features is None and use_cache and required != DEFAULT_FEATURES:
+        # A full analysis of the same region covers any subset
+        features = _analysis_cache.get(_analysis_key(fingerprint, start_time, duration, DEFAULT_FEATURES))
+    if features is None:
+        features = _compute_audio_features(audio_path, start_time, duration, required)
+        _make_read_only(features)
+        _analysis_cache.set(key, features)
+    else:
+        # Entries unpickled from disk come back writeable
+        _make_read_only(features)
+    return features
+
+
+def _make_read_only(features: AudioFeatures):
+    """Mark every array field read-only so callers can't corrupt a cached result."""
+    for value in vars(features).values():
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+
+
+def _analysis_key(fingerprint: str, start_time: float, duration: Optional[float], required: FrozenSet[str]) -> str:
+    """Cache key for one analysis; the content hash in the fingerprint invalidates it when the file changes."""
+    key_parts = (
+        ANALYSIS_CACHE_VERSION,
+        fingerprint,
+        float(start_time),
+        None if duration is None else float(duration),
+        tuple(sorted(required))
+    )
+    return hashlib.sha1(repr(key_parts).encode()).hexdigest()
+
+
+def _compute_audio_features(
+    audio_path: str,
+    start_time: float,
+    duration: Optional[float],
+    required: FrozenSet[str] = DEFAULT_FEATURES
+) -> AudioFeatures:
+    """Run the librosa analysis pipeline (uncached), limited to the `required` stages."""
+    # Load audio file. Analysis doesn't need soxr's high-quality default; medium
+    # quality is as fast as the quick/low presets without shifting detected beats.
+    y, sr = librosa.load(
+        audio_path, sr=ANALYSIS_SAMPLE_RATE, offset=start_time, duration=duration,
+        res_type="soxr_mq"
+    )
+    actual_duration = len(y) / sr
+    hop_length = HOP_LENGTH
+    empty = np.zeros(0, dtype=np.float32)
     
-    # Onset detection (musical transients)
-    onset_frames = librosa.onset.onset_detect(y=y, sr=sr, onset_envelope=onset_env)
-    onset_times = librosa.frames_to_time(onset_frames, sr=sr).tolist()
+    # Single STFT shared by the onset and mel analysis (each would otherwise recompute it)
+    stft_mag = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=hop_length))
     
-    onset_strengths = []
-    for frame in onset_frames:
-        if frame < len(onset_env_normalized):
-            onset_strengths.append(float(onset_env_normalized[frame]))
-        else:
-            onset_strengths.append(0.5)
+    # Centered RMS frames line up with the STFT frames, so both share one time axis
+    times = librosa.frames_to_time(np.arange(stft_mag.shape[1]), sr=sr, hop_length=hop_length)
     
-    # Energy envelope (RMS energy over time)
-    hop_length = 512
-    rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
-    rms_normalized = rms / (rms.max() + 1e-6)
-    rms_times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=hop_length)
-    energy_envelope = list(zip(rms_times.tolist(), rms_normalized.tolist()))
+    tempo = 0.0
+    beat_times = beat_strengths = onset_times = onset_strengths = np.zeros(0)
     
-    # Frequency band analysis using mel spectrogram
-    mel_spec = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128, hop_length=hop_length)
-    mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
+    if required & {FEATURE_BEATS, FEATURE_ONSETS, FEATURE_BANDS}:
+        power_spec = stft_mag ** 2
+        mel_spec = (_get_mel_basis(sr, N_FFT, N_MELS) @ power_spec).astype(np.float32, copy=False)
+        
+        # Single log pass over the mel spectrogram. power_to_db(S, ref=np.max) would only
+        # shift this by a constant (top_db clipping is relative to the peak either way),
+        # and the band energies are min-max normalized, so the same array serves both.
+        mel_spec_db = librosa.power_to_db(mel_spec).astype(np.float32, copy=False)
     
-    # Normalize mel spectrogram
-    mel_spec_norm = (mel_spec_db - mel_spec_db.min()) / (mel_spec_db.max() - mel_spec_db.min() + 1e-6)
+    if required & {FEATURE_BEATS, FEATURE_ONSETS}:
+        # Onset envelopes from the mel spectrogram (same as librosa's default pipeline).
+        # Beat and onset strengths are both read off the mean-aggregated envelope.
+        onset_env = librosa.onset.onset_strength(S=mel_spec_db, sr=sr)
+        # Normalize in place; onset_detect rescales its input anyway, so the
+        # normalized envelope serves both strength lookups and peak picking
+        onset_env *= onset_env.dtype.type(1.0 / (onset_env.max() + 1e-6))
     
-    # Split into frequency bands (bass: 0-300Hz, mid: 300-2000Hz, high: 2000Hz+)
-    # Approximate mel bin ranges
-    bass_bins = mel_spec_norm[:20, :]  # Low frequencies
-    mid_bins = mel_spec_norm[20:80, :]  # Mid frequencies
-    high_bins = mel_spec_norm[80:, :]  # High frequencies
+    if FEATURE_BEATS in required:
+        # Beat detection (the beat tracker aggregates its envelope with a median)
+        beat_env = librosa.onset.onset_strength(S=mel_spec_db, sr=sr, aggregate=np.median)
+        tempo, beat_frames = librosa.beat.beat_track(onset_envelope=beat_env, sr=sr)
+        beat_times = librosa.frames_to_time(beat_frames, sr=sr)
+        
+        # Calculate beat strengths based on onset envelope at beat times
+        beat_strengths = _strengths_at_frames(onset_env, beat_frames)
     
-    bass_energy_values = bass_bins.mean(axis=0)
-    mid_energy_values = mid_bins.mean(axis=0)
-    high_energy_values = high_bins.mean(axis=0)
+    if FEATURE_ONSETS in required:
+        # Onset detection (musical transients)
+        onset_frames = librosa.onset.onset_detect(sr=sr, onset_envelope=onset_env)
+        onset_times = librosa.frames_to_time(onset_frames, sr=sr)
+        
+        onset_strengths = _strengths_at_frames(onset_env, onset_frames)
     
-    times = librosa.frames_to_time(np.arange(mel_spec_norm.shape[1]), sr=sr, hop_length=hop_length)
+    # Energy envelope (RMS energy over time)
+    if FEATURE_ENERGY in required:
+        rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
+        # rms is a fresh array that isn't reused, so normalize it in place
+        rms *= rms.dtype.type(1.0 / (rms.max() + 1e-6))
+        energy_envelope = rms.astype(np.float32, copy=False)
+    else:
+        energy_envelope = empty
     
-    bass_energy = list(zip(times.tolist(), bass_energy_values.tolist()))
-    mid_energy = list(zip(times.tolist(), mid_energy_values.tolist()))
-    high_energy = list(zip(times.tolist(), high_energy_values.tolist()))
+    # Normalize mel spectrogram and split it into bass/mid/high bands
+    if FEATURE_BANDS in required:
+        band_energies = _band_energies(mel_spec_db)
+    else:
+        band_energies = np.zeros((len(BAND_MEL_RANGES), 0), dtype=np.float32)
+    bass_energy_values, mid_energy_values, high_energy_values = band_energies
     
     # Compute additional metrics for AI interpretation
     # These are raw metrics - let AI interpret what they mean for effects
     onset_density = len(onset_times) / actual_duration if actual_duration > 0 else 0.0
     
-    # Average frequency band energies
-    avg_bass = float(np.mean(bass_energy_values)) if len(bass_energy_values) > 0 else 0.0
-    avg_mid = float(np.mean(mid_energy_values)) if len(mid_energy_values) > 0 else 0.0
-    avg_high = float(np.mean(high_energy_values)) if len(high_energy_values) > 0 else 0.0
+    # Average frequency band energies (one reduction over the (3, T) band array)
+    if band_energies.shape[1] > 0:
+        avg_bass, avg_mid, avg_high = band_energies.mean(axis=1).tolist()
+    else:
+        avg_bass = avg_mid = avg_high = 0.0
     
-    # Dynamic range (how much energy varies)
-    energy_values = [e[1] for e in energy_envelope]
-    dynamic_range = float(max(energy_values) - min(energy_values)) if energy_values else 0.0
+    # Dynamic range (how much energy varies) and average energy level,
+    # read straight off the RMS array
+    if len(energy_envelope) > 0:
+        dynamic_range = float(np.ptp(energy_envelope))
+        avg_energy = float(energy_envelope.mean())
+    else:
+        dynamic_range = 0.0
+        avg_energy = 0.0
     
     # Beat strength variance (are beats consistent or varied)
-    beat_variance = float(np.var(beat_strengths)) if len(beat_strengths) > 1 else 0.0
-    
-    # Average energy level
-    avg_energy = float(np.mean(energy_values)) if energy_values else 0.0
+    beat_variance = float(np.var(beat_strengths.astype(np.float32))) if len(beat_strengths) > 1 else 0.0
     
     return AudioFeatures(
         duration=actual_duration,
         sample_rate=sr,
-        tempo=float(tempo) if isinstance(tempo, np.ndarray) else tempo,
+        tempo=float(np.atleast_1d(tempo)[0]),
         beat_times=beat_times,
         beat_strengths=beat_strengths,
         onset_times=onset_times,
         onset_strengths=onset_strengths,
+        times=times,
         energy_envelope=energy_envelope,
-        bass_energy=bass_energy,
-        mid_energy=mid_energy,
-        high_energy=high_energy,
+        bass_energy=bass_energy_values,
+        mid_energy=mid_energy_values,
+        high_energy=high_energy_values,
         onset_density=onset_density,
         average_bass=avg_bass,
         average_mid=avg_mid,
@@ -156,7 +373,8 @@ def analyze_audio(audio_path: str, start_time: float = 0.0, duration: float = No
 def get_waveform_data(audio_path: str, num_points: int = 200) -> List[Tuple[float, float]]:
     """
     Get downsampled waveform data for visualization.
-    Uses a very low sample rate for speed.
+    Streams the file block-by-block through soundfile so the full waveform is
+    never held in memory; falls back to a low-rate librosa decode otherwise.
     
     Args:
         audio_path: Path to the audio file
@@ -165,40 +383,75 @@ def get_waveform_data(audio_path: str, num_points: int = 200) -> List[Tuple[floa
     Returns:
         List of (time, amplitude) tuples
     """
+    try:
+        return _stream_waveform_peaks(audio_path, num_points)
+    except (sf.SoundFileError, RuntimeError):
+        pass
+    
     # Use very low sample rate for fast loading (just for visualization)
     # 8000 Hz is enough for waveform display
     y, sr = librosa.load(audio_path, sr=8000, mono=True)
     duration = len(y) / sr
     
     # Cache this for later use
-    _audio_cache[audio_path] = {'duration': duration}
+    _duration_cache.set(_duration_key(audio_path), duration)
     
-    # Downsample for visualization
+    # Downsample for visualization: reshape into (num_chunks, chunk_size)
+    # and take the peak amplitude of each chunk in one reduction
     chunk_size = max(1, len(y) // num_points)
+    num_chunks = min(num_points, len(y) // chunk_size)
     
-    waveform_data = []
-    for i in range(0, len(y), chunk_size):
-        chunk = y[i:i + chunk_size]
-        if len(chunk) > 0:
-            # Use peak amplitude for this chunk
-            peak = float(np.max(np.abs(chunk)))
-            time = (i + chunk_size // 2) / sr
-            waveform_data.append((time, peak))
+    peaks = np.abs(y[:num_chunks * chunk_size]).reshape(num_chunks, chunk_size).max(axis=1)
+    times = (np.arange(num_chunks) * chunk_size + chunk_size // 2) / sr
+    
+    return list(zip(times.tolist(), peaks.tolist()))
+
+
+def _stream_waveform_peaks(audio_path: str, num_points: int) -> List[Tuple[float, float]]:
+    """Compute per-chunk peak amplitudes at the native sample rate, one block at a time."""
+    with sf.SoundFile(audio_path) as f:
+        sr = f.samplerate
+        total = f.frames
+        
+        # Cache this for later use
+        _duration_cache.set(_duration_key(audio_path), total / sr)
+        
+        chunk_size = max(1, total // num_points)
+        num_chunks = min(num_points, total // chunk_size)
+        
+        peaks = np.zeros(num_chunks, dtype=np.float32)
+        blocks = f.blocks(blocksize=chunk_size, dtype="float32", always_2d=True, frames=num_chunks * chunk_size)
+        for i, block in enumerate(blocks):
+            if len(block) > 0:
+                # Mix down to mono like librosa.load(mono=True) before taking the peak
+                peaks[i] = np.abs(block.mean(axis=1)).max()
     
-    return waveform_data[:num_points]
+    times = (np.arange(num_chunks) * chunk_size + chunk_size // 2) / sr
+    return list(zip(times.tolist(), peaks.tolist()))
 
 
 def get_audio_duration(audio_path: str) -> float:
     """
     Get the duration of an audio file in seconds.
-    Uses ffprobe for speed (doesn't decode the entire file).
+    Reads the header via soundfile (no decoding, no subprocess), falling back
+    to ffprobe for formats libsndfile can't open.
     """
     # Check cache first
-    if audio_path in _audio_cache and 'duration' in _audio_cache[audio_path]:
-        return _audio_cache[audio_path]['duration']
+    cache_key = _duration_key(audio_path)
+    duration = _duration_cache.get(cache_key)
+    if duration is not None:
+        return duration
+    
+    try:
+        # Header-only read - microseconds for WAV/FLAC/OGG (and MP3 on libsndfile>=1.1)
+        duration = sf.info(audio_path).duration
+        _duration_cache.set(cache_key, duration)
+        return duration
+    except (sf.SoundFileError, RuntimeError):
+        pass
     
     try:
-        # Use ffprobe for fast duration detection
+        # Fallback: ffprobe for formats soundfile doesn't support
         cmd = [
             'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
             '-of', 'json', audio_path
@@ -207,27 +460,13 @@ def get_audio_duration(audio_path: str) -> float:
         if result.returncode == 0:
             data = json.loads(result.stdout)
             duration = float(data['format']['duration'])
-            _audio_cache[audio_path] = {'duration': duration}
+            _duration_cache.set(cache_key, duration)
             return duration
     except Exception:
         pass
     
-    # Fallback: use librosa with duration=0 to just get metadata
-    try:
-        # Load just 1 second at low sample rate to estimate
-        y, sr = librosa.load(audio_path, sr=8000, mono=True, duration=1)
-        # Get actual duration from file info
-        import soundfile as sf
-        info = sf.info(audio_path)
-        duration = info.duration
-        _audio_cache[audio_path] = {'duration': duration}
-        return duration
-    except Exception:
-        pass
-    
     # Last resort: load full file
     y, sr = librosa.load(audio_path, sr=8000, mono=True)
     duration = len(y) / sr
-    _audio_cache[audio_path] = {'duration': duration}
+    _duration_cache.set(cache_key, duration)
     return duration
-
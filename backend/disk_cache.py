@@ -0,0 +1,137 @@
+"""
+Disk Cache Module
+Shared on-disk caching for audio/image analyses and generated sprites.
+"""
+
+import os
+import time
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+from dotenv import load_dotenv
+
+# Load environment variables (VISUALIZER_CACHE_DIR may be set in .env)
+load_dotenv()
+
+# Root for every cache directory (audio analyses and durations, image analyses, sprites)
+CACHE_DIR = Path(os.getenv("VISUALIZER_CACHE_DIR", str(Path.home() / ".cache" / "visualizer")))
+
+# Temp files older than this are leftovers from crashed writes, not writes in progress
+STALE_TMP_SECONDS = 3600
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]) -> bool:
+    """
+    Write a cache file atomically: write(tmp_path) fills a temp file next to
+    path, which is then renamed over it. Returns False if the write failed.
+    """
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def evict_lru(directory: Path, pattern: str, max_bytes: int):
+    """
+    Delete the least recently used files matching pattern until the directory
+    fits in max_bytes. Temp files count toward the total; stale ones are deleted.
+    """
+    try:
+        entries = [(entry.stat(), entry) for entry in directory.glob(pattern)]
+        temps = [(entry.stat(), entry) for entry in directory.glob("*.tmp")]
+    except OSError:
+        return
+    
+    total = 0
+    stale_before = time.time() - STALE_TMP_SECONDS
+    for stat, entry in temps:
+        try:
+            if stat.st_mtime < stale_before:
+                entry.unlink()
+                continue
+        except OSError:
+            pass
+        total += stat.st_size
+    
+    total += sum(stat.st_size for stat, _ in entries)
+    for stat, entry in sorted(entries, key=lambda item: item[0].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            entry.unlink()
+            total -= stat.st_size
+        except OSError:
+            pass
+
+
+class PersistentCache:
+    """
+    Bounded in-memory LRU backed by one file per entry on disk (pickle by default).
+    Lookups go memory -> disk; disk writes are atomic (temp file + rename).
+    On disk, least recently used entries are deleted once the directory
+    exceeds max_disk_bytes.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        max_disk_bytes: int,
+        suffix: str = ".pkl",
+        dumps: Callable[[Any], bytes] = lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+        loads: Callable[[bytes], Any] = pickle.loads
+    ):
+        self.directory = CACHE_DIR / name
+        self.maxsize = maxsize
+        self.max_disk_bytes = max_disk_bytes
+        self.suffix = suffix
+        self._dumps = dumps
+        self._loads = loads
+        self._mem: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+        
+        path = self._path(key)
+        try:
+            value = self._loads(path.read_bytes())
+        except Exception:
+            return None
+        
+        try:
+            os.utime(path)  # mark as recently used for disk eviction
+        except OSError:
+            pass
+        self._remember(key, value)
+        return value
+    
+    def set(self, key: str, value: Any):
+        self._remember(key, value)
+        
+        data = self._dumps(value)
+        if atomic_write(self._path(key), lambda tmp_path: tmp_path.write_bytes(data)):
+            evict_lru(self.directory, f"*{self.suffix}", self.max_disk_bytes)
+    
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._mem[key] = value
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.maxsize:
+                self._mem.popitem(last=False)
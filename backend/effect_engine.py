@@ -4,45 +4,99 @@ Maps audio features to visual effect parameters based on toggle-based user setti
 No BPM-based assumptions - effects are controlled explicitly by user toggles.
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Tuple, Optional
-from audio_analysis import AudioFeatures
-import math
+from typing import List, Dict, Any, Tuple, Optional, FrozenSet
+from audio_analysis import AudioFeatures, FEATURE_BEATS, FEATURE_ONSETS
+import numpy as np
 
+# numba ships with librosa; the envelope kernel runs as plain Python if it's missing
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class EffectToggle:
     """A single effect toggle with enabled state and intensity."""
     enabled: bool = False
     intensity: float = 0.5  # 0-1
 
 
-@dataclass
-class EffectToggles:
-    """All user-controlled effect toggles."""
+# Toggle names in packed-array order (index into EffectToggles.enabled / .intensity)
+TOGGLE_NAMES: Tuple[str, ...] = (
     # Element effects
-    element_glow: EffectToggle = field(default_factory=lambda: EffectToggle(True, 0.5))
-    element_scale: EffectToggle = field(default_factory=lambda: EffectToggle(True, 0.3))
-    neon_outline: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.5))
-    echo_trail: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.4))
-    
+    "element_glow", "element_scale", "neon_outline", "echo_trail",
     # Particle effects
-    particle_burst: EffectToggle = field(default_factory=lambda: EffectToggle(True, 0.5))
-    energy_trails: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.4))
-    light_flares: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.3))
-    
+    "particle_burst", "energy_trails", "light_flares",
     # Style effects
-    glitch: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.3))
-    ripple_wave: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.4))
-    film_grain: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.2))
-    strobe_flash: EffectToggle = field(default_factory=lambda: EffectToggle(False, 0.3))
-    vignette_pulse: EffectToggle = field(default_factory=lambda: EffectToggle(True, 0.4))
-    
+    "glitch", "ripple_wave", "film_grain", "strobe_flash", "vignette_pulse",
     # Background
-    background_dim: EffectToggle = field(default_factory=lambda: EffectToggle(True, 0.3))
+    "background_dim",
+)
+TOGGLE_INDEX: Dict[str, int] = {name: i for i, name in enumerate(TOGGLE_NAMES)}
 
+# Default (enabled, intensity) for each toggle
+_TOGGLE_DEFAULTS: Dict[str, Tuple[bool, float]] = {
+    "element_glow": (True, 0.5),
+    "element_scale": (True, 0.3),
+    "neon_outline": (False, 0.5),
+    "echo_trail": (False, 0.4),
+    "particle_burst": (True, 0.5),
+    "energy_trails": (False, 0.4),
+    "light_flares": (False, 0.3),
+    "glitch": (False, 0.3),
+    "ripple_wave": (False, 0.4),
+    "film_grain": (False, 0.2),
+    "strobe_flash": (False, 0.3),
+    "vignette_pulse": (True, 0.4),
+    "background_dim": (True, 0.3),
+}
+_DEFAULT_ENABLED = np.array([_TOGGLE_DEFAULTS[n][0] for n in TOGGLE_NAMES], dtype=np.uint8)
+_DEFAULT_INTENSITY = np.array([_TOGGLE_DEFAULTS[n][1] for n in TOGGLE_NAMES], dtype=np.float64)
 
-@dataclass
+
+class EffectToggles:
+    """
+    All user-controlled effect toggles, packed into two parallel arrays indexed
+    by TOGGLE_NAMES rather than 13 separate objects.
+    Attribute access (e.g. toggles.glitch) still reads/writes an EffectToggle.
+    """
+    __slots__ = ("enabled", "intensity")
+    
+    def __init__(self, **toggles: EffectToggle):
+        object.__setattr__(self, "enabled", _DEFAULT_ENABLED.copy())
+        object.__setattr__(self, "intensity", _DEFAULT_INTENSITY.copy())
+        for name, toggle in toggles.items():
+            setattr(self, name, toggle)
+    
+    def __getattr__(self, name: str) -> EffectToggle:
+        idx = TOGGLE_INDEX.get(name)
+        if idx is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return EffectToggle(bool(self.enabled[idx]), float(self.intensity[idx]))
+    
+    def __setattr__(self, name: str, value: Any):
+        idx = TOGGLE_INDEX.get(name)
+        if idx is None:
+            object.__setattr__(self, name, value)
+            return
+        self.enabled[idx] = value.enabled
+        self.intensity[idx] = value.intensity
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EffectToggles):
+            return NotImplemented
+        return (np.array_equal(self.enabled, other.enabled)
+                and np.array_equal(self.intensity, other.intensity))
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in TOGGLE_NAMES)
+        return f"EffectToggles({fields})"
+
+
+@dataclass(slots=True, frozen=True)
 class SubjectBounds:
     """Bounding box for the detected subject (as percentages 0-1)."""
     x: float = 0.25
@@ -59,7 +113,7 @@ class SubjectBounds:
         return self.y + self.h / 2
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GlowPoint:
     """A point that emits light."""
     x: float
@@ -67,7 +121,7 @@ class GlowPoint:
     intensity: float = 1.0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ImageContext:
     """Context from image analysis for effect generation."""
     bounds: SubjectBounds = field(default_factory=SubjectBounds)
@@ -80,7 +134,7 @@ class ImageContext:
 # Effect Parameter Structures
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ElementGlowParams:
     """Parameters for element glow effect."""
     enabled: bool = True
@@ -88,9 +142,11 @@ class ElementGlowParams:
     color: Tuple[int, int, int] = (255, 200, 100)  # Warm glow default
     radius: float = 50.0  # Glow radius in pixels
     pulse_triggers: List[Tuple[float, float]] = field(default_factory=list)  # (time, strength)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Strengths, same order
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ElementScaleParams:
     """Parameters for element scale pulse effect."""
     enabled: bool = True
@@ -98,9 +154,11 @@ class ElementScaleParams:
     base_scale: float = 1.0
     max_scale: float = 1.1
     triggers: List[Tuple[float, float]] = field(default_factory=list)  # (time, strength)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Strengths, same order
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NeonOutlineParams:
     """Parameters for neon outline effect."""
     enabled: bool = False
@@ -109,9 +167,11 @@ class NeonOutlineParams:
     width: float = 3.0
     glow_radius: float = 10.0
     pulse_triggers: List[Tuple[float, float]] = field(default_factory=list)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Strengths, same order
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EchoTrailParams:
     """Parameters for echo/ghost trail effect."""
     enabled: bool = False
@@ -121,7 +181,7 @@ class EchoTrailParams:
     opacity_decay: float = 0.7  # Each trail is this much dimmer
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ParticleBurstParams:
     """Parameters for particle burst effect."""
     enabled: bool = True
@@ -132,6 +192,8 @@ class ParticleBurstParams:
     speed: float = 200.0  # Pixels per second
     lifetime: float = 1.0  # Seconds
     triggers: List[Tuple[float, float]] = field(default_factory=list)  # (time, strength)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
     # Full subject bounds for spawning from perimeter
     bounds_x: float = 0.25  # Normalized position
     bounds_y: float = 0.25
@@ -139,7 +201,7 @@ class ParticleBurstParams:
     bounds_h: float = 0.5
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EnergyTrailsParams:
     """Parameters for energy trails effect."""
     enabled: bool = False
@@ -155,7 +217,7 @@ class EnergyTrailsParams:
     bounds_h: float = 0.5
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LightFlaresParams:
     """Parameters for light flares effect."""
     enabled: bool = False
@@ -164,9 +226,11 @@ class LightFlaresParams:
     colors: List[Tuple[int, int, int]] = field(default_factory=lambda: [(255, 255, 200)])
     size: float = 100.0
     triggers: List[Tuple[float, float]] = field(default_factory=list)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Strengths, same order
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GlitchParams:
     """Parameters for glitch effect."""
     enabled: bool = False
@@ -177,9 +241,14 @@ class GlitchParams:
     scan_line_opacity: float = 0.1
     slice_displacement: bool = True
     triggers: List[Tuple[float, float, float]] = field(default_factory=list)  # (time, duration, intensity)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_order: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # triggers index per sorted time
+    trigger_durations: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # In sorted-time order
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # In sorted-time order
+    max_duration: float = 0.0  # Longest trigger duration (bounds the lookup window)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RippleWaveParams:
     """Parameters for ripple wave effect."""
     enabled: bool = False
@@ -193,9 +262,11 @@ class RippleWaveParams:
     amplitude: float = 10.0
     speed: float = 200.0  # Pixels per second
     triggers: List[Tuple[float, float]] = field(default_factory=list)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FilmGrainParams:
     """Parameters for film grain effect."""
     enabled: bool = False
@@ -204,17 +275,17 @@ class FilmGrainParams:
     color_variation: float = 0.1
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StrobeFlashParams:
     """Parameters for strobe flash effect."""
     enabled: bool = False
     intensity: float = 0.3
     flash_duration: float = 0.05  # Seconds
     color: Tuple[int, int, int] = (255, 255, 255)
-    triggers: List[float] = field(default_factory=list)  # Times of flashes
+    triggers: List[float] = field(default_factory=list)  # Times of flashes, in order
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VignettePulseParams:
     """Parameters for vignette pulse effect."""
     enabled: bool = True
@@ -222,9 +293,11 @@ class VignettePulseParams:
     base_strength: float = 0.5
     pulse_strength: float = 0.4
     triggers: List[Tuple[float, float]] = field(default_factory=list)
+    trigger_times: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Sorted trigger start times
+    trigger_strengths: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # Strengths, same order
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BackgroundDimParams:
     """Parameters for background dim effect."""
     enabled: bool = True
@@ -233,7 +306,7 @@ class BackgroundDimParams:
     blur_amount: float = 2.0  # Blur radius
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EffectParameters:
     """All effect parameters for a video."""
     duration: float
@@ -256,10 +329,47 @@ class EffectParameters:
     background_dim: BackgroundDimParams = field(default_factory=BackgroundDimParams)
 
 
+@dataclass(slots=True)
+class FrameEffectState:
+    """
+    Time-varying effect values for a single frame (see get_effect_value_at_time).
+    Defaults are the "effect idle" values; everything constant over the video
+    lives on EffectParameters instead.
+    """
+    element_glow_intensity: float = 0.0
+    element_scale: float = 1.0
+    neon_outline_intensity: float = 0.0
+    # Active bursts as parallel arrays: progress 0-1 and strength per burst
+    particle_burst_progress: np.ndarray = field(default_factory=lambda: np.empty(0), compare=False)
+    particle_burst_strength: np.ndarray = field(default_factory=lambda: np.empty(0), compare=False)
+    light_flares_intensity: float = 0.0
+    glitch_active: bool = False
+    glitch_intensity: float = 0.0
+    glitch_chromatic: float = 0.0
+    glitch_rgb_split: float = 0.0
+    glitch_scan_lines: bool = False
+    glitch_scan_opacity: float = 0.0
+    glitch_slice: bool = False
+    # Active ripples as parallel arrays: radius (px) and amplitude per wave
+    ripple_radii: np.ndarray = field(default_factory=lambda: np.empty(0), compare=False)
+    ripple_amplitudes: np.ndarray = field(default_factory=lambda: np.empty(0), compare=False)
+    strobe_active: bool = False
+    strobe_intensity: float = 0.0
+    vignette_strength: float = 0.0
+
+
+# Two-digit hex byte -> value, both cases, so hex_to_rgb is three dict lookups
+_HEX_BYTE: Dict[str, int] = {f"{i:02x}": i for i in range(256)} | {f"{i:02X}": i for i in range(256)}
+
+
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Convert hex color string to RGB tuple."""
     hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    try:
+        return (_HEX_BYTE[hex_color[0:2]], _HEX_BYTE[hex_color[2:4]], _HEX_BYTE[hex_color[4:6]])
+    except KeyError:
+        # Mixed-case or malformed input: let int() parse (or reject) it
+        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
 def rgb_to_hsv(r: int, g: int, b: int) -> Tuple[float, float, float]:
@@ -389,6 +499,206 @@ def _hue_variance(hues: List[float]) -> float:
     return 360 - max_gap
 
 
+# Effects whose triggers come from detected beats
+BEAT_DRIVEN_TOGGLES: Tuple[str, ...] = (
+    "element_glow", "element_scale", "neon_outline", "particle_burst",
+    "light_flares", "ripple_wave", "strobe_flash", "vignette_pulse",
+)
+
+# Base beat-strength threshold per beat-driven effect (None = every beat triggers).
+# Thresholds scale inversely with intensity: at 100% intensity, all beats trigger.
+_BEAT_TRIGGER_THRESHOLDS: Dict[str, Optional[float]] = {
+    "element_glow": 0.3,
+    "element_scale": None,
+    "neon_outline": 0.4,
+    "particle_burst": 0.4,
+    "light_flares": 0.6,
+    "ripple_wave": 0.5,
+    "strobe_flash": 0.8,
+    "vignette_pulse": None,
+}
+_BEAT_TOGGLE_INDEX = np.array([TOGGLE_INDEX[name] for name in BEAT_DRIVEN_TOGGLES])
+_BEAT_THRESHOLD_BASE = np.array([
+    np.nan if _BEAT_TRIGGER_THRESHOLDS[name] is None else _BEAT_TRIGGER_THRESHOLDS[name]
+    for name in BEAT_DRIVEN_TOGGLES
+])
+
+
+def required_audio_features(toggles: EffectToggles) -> FrozenSet[str]:
+    """
+    Audio analysis stages calculate_effect_parameters() will read for these toggles.
+    Pass to analyze_audio(required=...) to skip beat tracking / onset detection
+    when no enabled effect uses them.
+    """
+    required = set()
+    if any(toggles.enabled[TOGGLE_INDEX[name]] for name in BEAT_DRIVEN_TOGGLES):
+        required.add(FEATURE_BEATS)
+    if toggles.glitch.enabled:
+        required.add(FEATURE_ONSETS)
+        # High-intensity glitch also fires on beats
+        if toggles.glitch.intensity > 0.5:
+            required.add(FEATURE_BEATS)
+    return frozenset(required)
+
+
+def _window_bounds(trigger_times: np.ndarray, time: float, window: float) -> Tuple[int, int]:
+    """Index range of sorted start times in [time - window, time], padded slightly for rounding."""
+    # Most frames fall before the first or after the last trigger's window: skip the search
+    if len(trigger_times) == 0 or time + 1e-9 < trigger_times[0] or time - window - 1e-9 > trigger_times[-1]:
+        return 0, 0
+    lo = int(np.searchsorted(trigger_times, time - window - 1e-9))
+    hi = int(np.searchsorted(trigger_times, time + 1e-9, side="right"))
+    return lo, hi
+
+
+def _pulse_arrays(
+    triggers: List[Tuple[float, float]],
+    trigger_times: Optional[np.ndarray],
+    trigger_strengths: Optional[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(times, strengths) arrays for a (time, strength) trigger list; built on the fly if not precomputed."""
+    if trigger_times is None or trigger_strengths is None:
+        trigger_array = np.asarray(triggers, dtype=np.float64).reshape(-1, 2)
+        return trigger_array[:, 0], trigger_array[:, 1]
+    return trigger_times, trigger_strengths
+
+
+def _pulse_envelope(
+    time, trigger_times, strengths, attack, decay, window,
+    base, gain, strength_floor, ease_out
+):
+    """
+    Peak attack/decay pulse at `time` over triggers sorted by start time.
+    Each live trigger (0 <= dt < window) ramps up linearly for `attack` seconds, then
+    decays over `decay` seconds (linearly, or quadratic ease-out). Its value is
+    base + pulse * gain * (strength_floor + (1 - strength_floor) * strength);
+    the result is the max over triggers and `base`.
+    """
+    # Same padded binary search as _window_bounds, so only live triggers are visited
+    lo = np.searchsorted(trigger_times, time - window - 1e-9)
+    hi = np.searchsorted(trigger_times, time + 1e-9, side="right")
+    out = base
+    for i in range(lo, hi):
+        dt = time - trigger_times[i]
+        if 0.0 <= dt < window:
+            if dt < attack:
+                pulse = dt / attack
+            else:
+                progress = (dt - attack) / decay
+                pulse = 1.0 - progress * progress if ease_out else 1.0 - progress
+            value = base + pulse * gain * (strength_floor + (1.0 - strength_floor) * strengths[i])
+            if value > out:
+                out = value
+    return out
+
+
+if njit is not None:
+    _pulse_envelope = njit(cache=True, fastmath=True)(_pulse_envelope)
+
+
+@dataclass(slots=True, frozen=True)
+class _PulseShape:
+    """Attack/decay envelope of one pulse-driven effect (see _pulse_envelope)."""
+    attack: float
+    decay: float
+    window: float  # attack + decay
+    strength_floor: float = 0.0
+    ease_out: bool = False
+
+
+# One shape per pulse-driven effect, shared by the per-frame and whole-timeline paths
+_PULSE_SHAPES: Dict[str, _PulseShape] = {
+    "element_glow": _PulseShape(0.05, 0.25, 0.3),
+    "element_scale": _PulseShape(0.05, 0.15, 0.2, ease_out=True),
+    "neon_outline": _PulseShape(0.03, 0.22, 0.25),
+    "light_flares": _PulseShape(0.05, 0.35, 0.4),
+    "vignette_pulse": _PulseShape(0.08, 0.32, 0.4, strength_floor=0.5),
+}
+
+
+def _first_live_trigger(time, trigger_times, durations, order, max_duration):
+    """
+    Sorted position of the live trigger (start <= time < start + duration) that comes
+    first in the original list order, or -1 if none is live. Only triggers starting
+    within `max_duration` before `time` can be live, so only those are visited.
+    """
+    lo = np.searchsorted(trigger_times, time - max_duration - 1e-9)
+    hi = np.searchsorted(trigger_times, time + 1e-9, side="right")
+    best = -1
+    for i in range(lo, hi):
+        if trigger_times[i] <= time < trigger_times[i] + durations[i]:
+            if best < 0 or order[i] < order[best]:
+                best = i
+    return best
+
+
+if njit is not None:
+    _first_live_trigger = njit(cache=True)(_first_live_trigger)
+
+
+def _envelope_at(
+    triggers: List[Tuple[float, float]],
+    trigger_times: Optional[np.ndarray],
+    trigger_strengths: Optional[np.ndarray],
+    time: float,
+    shape: _PulseShape,
+    base: float,
+    gain: float
+) -> float:
+    """
+    _pulse_envelope for one effect's time-ordered triggers. Returns `base` without
+    entering the kernel when `time` is before the first trigger or past the last
+    one's window, which is where most frames of sparse effects fall.
+    """
+    if not triggers or time < triggers[0][0] or time - triggers[-1][0] >= shape.window:
+        return base
+    times, strengths = _pulse_arrays(triggers, trigger_times, trigger_strengths)
+    return _pulse_envelope(
+        time, times, strengths, shape.attack, shape.decay, shape.window,
+        base, gain, shape.strength_floor, shape.ease_out
+    )
+
+
+def _pulse_values(
+    dt: np.ndarray,
+    strength: np.ndarray,
+    shape: _PulseShape,
+    base: float,
+    gain: float
+) -> np.ndarray:
+    """Vectorized _pulse_envelope value for live (dt, strength) pairs, before taking the max."""
+    progress = (dt - shape.attack) / shape.decay
+    decay = 1 - progress * progress if shape.ease_out else 1 - progress
+    pulse = np.where(dt < shape.attack, dt / shape.attack, decay)
+    return base + pulse * gain * (shape.strength_floor + (1 - shape.strength_floor) * strength)
+
+
+def _beat_trigger_masks(toggles: EffectToggles, beat_strengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Which beats trigger each beat-driven effect. All effects' thresholds are tested
+    in one broadcast compare over the beat strengths instead of a pass per effect.
+    """
+    intensity = toggles.intensity[_BEAT_TOGGLE_INDEX]
+    thresholds = np.where(np.isnan(_BEAT_THRESHOLD_BASE), -np.inf, _BEAT_THRESHOLD_BASE * (1 - intensity))
+    masks = beat_strengths[np.newaxis, :] >= thresholds[:, np.newaxis]
+    return dict(zip(BEAT_DRIVEN_TOGGLES, masks))
+
+
+def _pulse_triggers(
+    times: np.ndarray,
+    strengths: np.ndarray,
+    mask: np.ndarray,
+    scale: float
+) -> Tuple[List[Tuple[float, float]], np.ndarray, np.ndarray]:
+    """
+    (time, strength * scale) for every masked event, returned as the trigger list
+    plus the parallel start-time and strength arrays the per-frame paths read.
+    """
+    picked_times = times[mask]
+    picked_strengths = strengths[mask] * scale
+    return list(zip(picked_times.tolist(), picked_strengths.tolist())), picked_times, picked_strengths
+
+
 def calculate_effect_parameters(
     audio_features: AudioFeatures,
     toggles: EffectToggles,
@@ -415,101 +725,118 @@ def calculate_effect_parameters(
     colors_rgb = [hex_to_rgb(c) for c in ctx.colors[:5]] if ctx.colors else [(255, 200, 100)]
     primary_color = colors_rgb[0] if colors_rgb else (255, 200, 100)
     
+    # Beat/onset events as arrays; beat thresholds for every effect are tested in one pass
+    beat_times = np.asarray(audio_features.beat_times, dtype=np.float64)
+    beat_strengths = np.asarray(audio_features.beat_strengths, dtype=np.float64)
+    onset_times = np.asarray(audio_features.onset_times, dtype=np.float64)
+    onset_strengths = np.asarray(audio_features.onset_strengths, dtype=np.float64)
+    beat_masks = _beat_trigger_masks(toggles, beat_strengths)
+    
     # ========================================================================
     # ELEMENT GLOW
     # ========================================================================
-    glow_triggers = []
-    if toggles.element_glow.enabled:
-        # Threshold scales inversely with intensity: at 100% intensity, all beats trigger
-        threshold = 0.3 * (1 - toggles.element_glow.intensity)
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            if beat_strength >= threshold:
-                glow_triggers.append((beat_time, beat_strength * toggles.element_glow.intensity))
+    # Each toggles.<name> read unpacks a fresh EffectToggle, so every section binds its toggle once
+    glow_toggle = toggles.element_glow
+    glow_triggers, glow_times, glow_strengths = [], np.zeros(0), np.zeros(0)
+    if glow_toggle.enabled:
+        glow_triggers, glow_times, glow_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["element_glow"], glow_toggle.intensity
+        )
     
     element_glow = ElementGlowParams(
-        enabled=toggles.element_glow.enabled,
-        intensity=toggles.element_glow.intensity,
+        enabled=glow_toggle.enabled,
+        intensity=glow_toggle.intensity,
         color=primary_color,
-        radius=30 + toggles.element_glow.intensity * 70,
-        pulse_triggers=glow_triggers
+        radius=30 + glow_toggle.intensity * 70,
+        pulse_triggers=glow_triggers,
+        trigger_times=glow_times,
+        trigger_strengths=glow_strengths
     )
     
     # ========================================================================
     # ELEMENT SCALE
     # ========================================================================
-    scale_triggers = []
-    if toggles.element_scale.enabled:
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            scale_triggers.append((beat_time, beat_strength * toggles.element_scale.intensity))
+    scale_toggle = toggles.element_scale
+    scale_triggers, scale_times, scale_strengths = [], np.zeros(0), np.zeros(0)
+    if scale_toggle.enabled:
+        scale_triggers, scale_times, scale_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["element_scale"], scale_toggle.intensity
+        )
     
     element_scale = ElementScaleParams(
-        enabled=toggles.element_scale.enabled,
-        intensity=toggles.element_scale.intensity,
+        enabled=scale_toggle.enabled,
+        intensity=scale_toggle.intensity,
         base_scale=1.0,
-        max_scale=1.0 + toggles.element_scale.intensity * 0.15,
-        triggers=scale_triggers
+        max_scale=1.0 + scale_toggle.intensity * 0.15,
+        triggers=scale_triggers,
+        trigger_times=scale_times,
+        trigger_strengths=scale_strengths
     )
     
     # ========================================================================
     # NEON OUTLINE
     # ========================================================================
-    outline_triggers = []
-    if toggles.neon_outline.enabled:
-        # Threshold scales inversely with intensity: at 100% intensity, all beats trigger
-        threshold = 0.4 * (1 - toggles.neon_outline.intensity)
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            if beat_strength >= threshold:
-                outline_triggers.append((beat_time, beat_strength * toggles.neon_outline.intensity))
+    outline_toggle = toggles.neon_outline
+    outline_triggers, outline_times, outline_strengths = [], np.zeros(0), np.zeros(0)
+    if outline_toggle.enabled:
+        outline_triggers, outline_times, outline_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["neon_outline"], outline_toggle.intensity
+        )
     
     # Use a contrasting color for outline
     outline_color = colors_rgb[1] if len(colors_rgb) > 1 else (0, 255, 255)
     
     neon_outline = NeonOutlineParams(
-        enabled=toggles.neon_outline.enabled,
-        intensity=toggles.neon_outline.intensity,
+        enabled=outline_toggle.enabled,
+        intensity=outline_toggle.intensity,
         color=outline_color,
-        width=2 + toggles.neon_outline.intensity * 4,
-        glow_radius=5 + toggles.neon_outline.intensity * 15,
-        pulse_triggers=outline_triggers
+        width=2 + outline_toggle.intensity * 4,
+        glow_radius=5 + outline_toggle.intensity * 15,
+        pulse_triggers=outline_triggers,
+        trigger_times=outline_times,
+        trigger_strengths=outline_strengths
     )
     
     # ========================================================================
     # ECHO TRAIL
     # ========================================================================
+    echo_toggle = toggles.echo_trail
     echo_trail = EchoTrailParams(
-        enabled=toggles.echo_trail.enabled,
-        intensity=toggles.echo_trail.intensity,
-        trail_count=3 + int(toggles.echo_trail.intensity * 5),
-        trail_spacing=0.03 + (1 - toggles.echo_trail.intensity) * 0.05,
-        opacity_decay=0.6 + (1 - toggles.echo_trail.intensity) * 0.2
+        enabled=echo_toggle.enabled,
+        intensity=echo_toggle.intensity,
+        trail_count=3 + int(echo_toggle.intensity * 5),
+        trail_spacing=0.03 + (1 - echo_toggle.intensity) * 0.05,
+        opacity_decay=0.6 + (1 - echo_toggle.intensity) * 0.2
     )
     
     # ========================================================================
     # PARTICLE BURST
     # ========================================================================
-    burst_triggers = []
-    if toggles.particle_burst.enabled:
-        # Lower base threshold so bursts trigger at all intensity levels
+    burst_toggle = toggles.particle_burst
+    burst_triggers, burst_times, burst_strengths = [], np.zeros(0), np.zeros(0)
+    if burst_toggle.enabled:
+        # Lower base threshold (see _BEAT_TRIGGER_THRESHOLDS) so bursts trigger at all intensity levels
         # At 0% intensity: threshold = 0.4 (only strongest beats)
         # At 50% intensity: threshold = 0.2 (moderate beats)
         # At 100% intensity: threshold = 0 (all beats)
-        threshold = 0.4 * (1 - toggles.particle_burst.intensity)
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            if beat_strength >= threshold:
-                burst_triggers.append((beat_time, beat_strength * toggles.particle_burst.intensity))
+        burst_triggers, burst_times, burst_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["particle_burst"], burst_toggle.intensity
+        )
     
     # Prepare particle colors - boost saturation/brightness for visibility
     particle_colors = prepare_particle_colors(colors_rgb[:5])
     
     particle_burst = ParticleBurstParams(
-        enabled=toggles.particle_burst.enabled,
-        intensity=toggles.particle_burst.intensity,
-        particle_count=int(30 + toggles.particle_burst.intensity * 70),
+        enabled=burst_toggle.enabled,
+        intensity=burst_toggle.intensity,
+        particle_count=int(30 + burst_toggle.intensity * 70),
         colors=particle_colors,
-        size_range=(2 + toggles.particle_burst.intensity * 2, 8 + toggles.particle_burst.intensity * 8),
-        speed=150 + toggles.particle_burst.intensity * 150,
-        lifetime=0.8 + toggles.particle_burst.intensity * 0.6,
+        size_range=(2 + burst_toggle.intensity * 2, 8 + burst_toggle.intensity * 8),
+        speed=150 + burst_toggle.intensity * 150,
+        lifetime=0.8 + burst_toggle.intensity * 0.6,
         triggers=burst_triggers,
+        trigger_times=burst_times,
+        trigger_strengths=burst_strengths,
         bounds_x=bounds.x,
         bounds_y=bounds.y,
         bounds_w=bounds.w,
@@ -519,16 +846,17 @@ def calculate_effect_parameters(
     # ========================================================================
     # ENERGY TRAILS
     # ========================================================================
+    trails_toggle = toggles.energy_trails
     # Use boosted colors for energy trails too (they need to be visible)
     trail_colors = prepare_particle_colors(colors_rgb[:3])[:2]
     
     energy_trails = EnergyTrailsParams(
-        enabled=toggles.energy_trails.enabled,
-        intensity=toggles.energy_trails.intensity,
-        trail_count=4 + int(toggles.energy_trails.intensity * 8),
+        enabled=trails_toggle.enabled,
+        intensity=trails_toggle.intensity,
+        trail_count=4 + int(trails_toggle.intensity * 8),
         colors=trail_colors,
-        width=1 + toggles.energy_trails.intensity * 3,
-        speed=0.5 + toggles.energy_trails.intensity * 1.0,
+        width=1 + trails_toggle.intensity * 3,
+        speed=0.5 + trails_toggle.intensity * 1.0,
         bounds_x=bounds.x,
         bounds_y=bounds.y,
         bounds_w=bounds.w,
@@ -538,110 +866,124 @@ def calculate_effect_parameters(
     # ========================================================================
     # LIGHT FLARES
     # ========================================================================
-    flare_triggers = []
-    if toggles.light_flares.enabled:
-        # Threshold scales inversely with intensity: at 100% intensity, all beats trigger
-        threshold = 0.6 * (1 - toggles.light_flares.intensity)
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            if beat_strength >= threshold:
-                flare_triggers.append((beat_time, beat_strength * toggles.light_flares.intensity))
+    flares_toggle = toggles.light_flares
+    flare_triggers, flare_times, flare_strengths = [], np.zeros(0), np.zeros(0)
+    if flares_toggle.enabled:
+        flare_triggers, flare_times, flare_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["light_flares"], flares_toggle.intensity
+        )
     
     flare_points = [(gp.x, gp.y) for gp in ctx.glow_points] if ctx.glow_points else [(bounds.center_x, bounds.center_y)]
     
     light_flares = LightFlaresParams(
-        enabled=toggles.light_flares.enabled,
-        intensity=toggles.light_flares.intensity,
+        enabled=flares_toggle.enabled,
+        intensity=flares_toggle.intensity,
         flare_points=flare_points,
         colors=[(255, 255, 200)] + colors_rgb[:1],
-        size=50 + toggles.light_flares.intensity * 100,
-        triggers=flare_triggers
+        size=50 + flares_toggle.intensity * 100,
+        triggers=flare_triggers,
+        trigger_times=flare_times,
+        trigger_strengths=flare_strengths
     )
     
     # ========================================================================
     # GLITCH
     # ========================================================================
-    glitch_triggers = []
-    if toggles.glitch.enabled:
-        intensity = toggles.glitch.intensity
+    glitch_toggle = toggles.glitch
+    glitch_starts = glitch_durations = glitch_strengths = np.zeros(0)
+    if glitch_toggle.enabled:
+        intensity = glitch_toggle.intensity
         # Threshold scales inversely with intensity: at 100% intensity, all onsets trigger
         threshold = 0.5 * (1 - intensity)
         
-        # Trigger on onset events
-        for onset_time, strength in zip(audio_features.onset_times, audio_features.onset_strengths):
-            if strength >= threshold:
-                # Longer glitch duration at higher intensities
-                glitch_duration = 0.08 + strength * 0.15 + intensity * 0.12
-                glitch_triggers.append((onset_time, glitch_duration, strength * intensity))
+        # Trigger on onset events (longer glitch duration at higher intensities)
+        mask = onset_strengths >= threshold
+        picked = onset_strengths[mask]
+        starts = [onset_times[mask]]
+        durations = [0.08 + picked * 0.15 + intensity * 0.12]
+        strengths = [picked * intensity]
         
         # At high intensity, also trigger on beats for more frequent glitching
         if intensity > 0.5:
-            beat_threshold = 0.4 * (1 - intensity)
-            for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-                if beat_strength >= beat_threshold:
-                    glitch_duration = 0.06 + beat_strength * 0.1 + intensity * 0.08
-                    # Slightly lower intensity for beat-triggered glitches to vary the effect
-                    glitch_triggers.append((beat_time, glitch_duration, beat_strength * intensity * 0.8))
+            mask = beat_strengths >= 0.4 * (1 - intensity)
+            picked = beat_strengths[mask]
+            starts.append(beat_times[mask])
+            durations.append(0.06 + picked * 0.1 + intensity * 0.08)
+            # Slightly lower intensity for beat-triggered glitches to vary the effect
+            strengths.append(picked * intensity * 0.8)
+        
+        glitch_starts = np.concatenate(starts)
+        glitch_durations = np.concatenate(durations)
+        glitch_strengths = np.concatenate(strengths)
+    
+    glitch_triggers = list(zip(glitch_starts.tolist(), glitch_durations.tolist(), glitch_strengths.tolist()))
+    # Onset and beat glitches are interleaved in time, so index them by sorted start
+    glitch_order = np.argsort(glitch_starts, kind="stable")
     
     glitch = GlitchParams(
-        enabled=toggles.glitch.enabled,
-        intensity=toggles.glitch.intensity,
-        chromatic_aberration=3 + toggles.glitch.intensity * 10,
-        rgb_split=2 + toggles.glitch.intensity * 6,
-        scan_lines=toggles.glitch.intensity > 0.3,
-        scan_line_opacity=0.05 + toggles.glitch.intensity * 0.1,
-        slice_displacement=toggles.glitch.intensity > 0.4,
-        triggers=glitch_triggers
+        enabled=glitch_toggle.enabled,
+        intensity=glitch_toggle.intensity,
+        chromatic_aberration=3 + glitch_toggle.intensity * 10,
+        rgb_split=2 + glitch_toggle.intensity * 6,
+        scan_lines=glitch_toggle.intensity > 0.3,
+        scan_line_opacity=0.05 + glitch_toggle.intensity * 0.1,
+        slice_displacement=glitch_toggle.intensity > 0.4,
+        triggers=glitch_triggers,
+        trigger_times=glitch_starts[glitch_order],
+        trigger_order=glitch_order,
+        trigger_durations=glitch_durations[glitch_order],
+        trigger_strengths=glitch_strengths[glitch_order],
+        max_duration=float(glitch_durations.max()) if glitch_durations.size else 0.0
     )
     
     # ========================================================================
     # RIPPLE WAVE
     # ========================================================================
-    ripple_triggers = []
-    if toggles.ripple_wave.enabled:
-        # Threshold scales inversely with intensity: at 100% intensity, all beats trigger
-        threshold = 0.5 * (1 - toggles.ripple_wave.intensity)
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            if beat_strength >= threshold:
-                ripple_triggers.append((beat_time, beat_strength * toggles.ripple_wave.intensity))
+    ripple_toggle = toggles.ripple_wave
+    ripple_triggers, ripple_times, ripple_strengths = [], np.zeros(0), np.zeros(0)
+    if ripple_toggle.enabled:
+        ripple_triggers, ripple_times, ripple_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["ripple_wave"], ripple_toggle.intensity
+        )
     
     ripple_wave = RippleWaveParams(
-        enabled=toggles.ripple_wave.enabled,
-        intensity=toggles.ripple_wave.intensity,
+        enabled=ripple_toggle.enabled,
+        intensity=ripple_toggle.intensity,
         bounds_x=bounds.x,
         bounds_y=bounds.y,
         bounds_w=bounds.w,
         bounds_h=bounds.h,
-        wavelength=30 + (1 - toggles.ripple_wave.intensity) * 40,
-        amplitude=5 + toggles.ripple_wave.intensity * 15,
-        speed=150 + toggles.ripple_wave.intensity * 150,
-        triggers=ripple_triggers
+        wavelength=30 + (1 - ripple_toggle.intensity) * 40,
+        amplitude=5 + ripple_toggle.intensity * 15,
+        speed=150 + ripple_toggle.intensity * 150,
+        triggers=ripple_triggers,
+        trigger_times=ripple_times,
+        trigger_strengths=ripple_strengths
     )
     
     # ========================================================================
     # FILM GRAIN
     # ========================================================================
+    grain_toggle = toggles.film_grain
     film_grain = FilmGrainParams(
-        enabled=toggles.film_grain.enabled,
-        intensity=toggles.film_grain.intensity,
-        grain_size=1 + toggles.film_grain.intensity * 2,
-        color_variation=0.05 + toggles.film_grain.intensity * 0.15
+        enabled=grain_toggle.enabled,
+        intensity=grain_toggle.intensity,
+        grain_size=1 + grain_toggle.intensity * 2,
+        color_variation=0.05 + grain_toggle.intensity * 0.15
     )
     
     # ========================================================================
     # STROBE FLASH
     # ========================================================================
+    strobe_toggle = toggles.strobe_flash
     strobe_triggers = []
-    if toggles.strobe_flash.enabled:
-        # Threshold scales inversely with intensity: at 100% intensity, all beats trigger
-        threshold = 0.8 * (1 - toggles.strobe_flash.intensity)
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            if beat_strength >= threshold:
-                strobe_triggers.append(beat_time)
+    if strobe_toggle.enabled:
+        strobe_triggers = beat_times[beat_masks["strobe_flash"]].tolist()
     
     strobe_flash = StrobeFlashParams(
-        enabled=toggles.strobe_flash.enabled,
-        intensity=toggles.strobe_flash.intensity,
-        flash_duration=0.03 + toggles.strobe_flash.intensity * 0.05,
+        enabled=strobe_toggle.enabled,
+        intensity=strobe_toggle.intensity,
+        flash_duration=0.03 + strobe_toggle.intensity * 0.05,
         color=(255, 255, 255),
         triggers=strobe_triggers
     )
@@ -649,27 +991,32 @@ def calculate_effect_parameters(
     # ========================================================================
     # VIGNETTE PULSE
     # ========================================================================
-    vignette_triggers = []
-    if toggles.vignette_pulse.enabled:
-        for beat_time, beat_strength in zip(audio_features.beat_times, audio_features.beat_strengths):
-            vignette_triggers.append((beat_time, beat_strength * toggles.vignette_pulse.intensity))
+    vignette_toggle = toggles.vignette_pulse
+    vignette_triggers, vignette_times, vignette_strengths = [], np.zeros(0), np.zeros(0)
+    if vignette_toggle.enabled:
+        vignette_triggers, vignette_times, vignette_strengths = _pulse_triggers(
+            beat_times, beat_strengths, beat_masks["vignette_pulse"], vignette_toggle.intensity
+        )
     
     vignette_pulse = VignettePulseParams(
-        enabled=toggles.vignette_pulse.enabled,
-        intensity=toggles.vignette_pulse.intensity,
-        base_strength=0.3 + toggles.vignette_pulse.intensity * 0.4,
-        pulse_strength=0.3 + toggles.vignette_pulse.intensity * 0.5,
-        triggers=vignette_triggers
+        enabled=vignette_toggle.enabled,
+        intensity=vignette_toggle.intensity,
+        base_strength=0.3 + vignette_toggle.intensity * 0.4,
+        pulse_strength=0.3 + vignette_toggle.intensity * 0.5,
+        triggers=vignette_triggers,
+        trigger_times=vignette_times,
+        trigger_strengths=vignette_strengths
     )
     
     # ========================================================================
     # BACKGROUND DIM
     # ========================================================================
+    dim_toggle = toggles.background_dim
     background_dim = BackgroundDimParams(
-        enabled=toggles.background_dim.enabled,
-        intensity=toggles.background_dim.intensity,
-        dim_amount=0.2 + toggles.background_dim.intensity * 0.4,
-        blur_amount=1 + toggles.background_dim.intensity * 4
+        enabled=dim_toggle.enabled,
+        intensity=dim_toggle.intensity,
+        dim_amount=0.2 + dim_toggle.intensity * 0.4,
+        blur_amount=1 + dim_toggle.intensity * 4
     )
     
     return EffectParameters(
@@ -692,85 +1039,216 @@ def calculate_effect_parameters(
     )
 
 
+def _trigger_frame_pairs(
+    frame_times: np.ndarray,
+    trigger_times: np.ndarray,
+    window: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (frame index, trigger index) pairs for every frame that falls within `window`
+    seconds after a trigger. The range is padded slightly; callers apply their exact
+    activation test to the pairs.
+    """
+    lo = np.searchsorted(frame_times, trigger_times - 1e-9)
+    hi = np.searchsorted(frame_times, trigger_times + window + 1e-9, side="right")
+    counts = hi - lo
+    trigger_idx = np.repeat(np.arange(len(trigger_times)), counts)
+    # Position of each pair within its trigger's frame range
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(lo, counts) + offsets, trigger_idx
+
+
+def _pulse_pairs(
+    frame_times: np.ndarray,
+    trigger_times: np.ndarray,
+    trigger_strengths: np.ndarray,
+    window: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Frame indices, dt and trigger strengths for every (frame, trigger) with 0 <= dt < window."""
+    frame_idx, trigger_idx = _trigger_frame_pairs(frame_times, trigger_times, window)
+    dt = frame_times[frame_idx] - trigger_times[trigger_idx]
+    live = (dt >= 0) & (dt < window)
+    return frame_idx[live], dt[live], trigger_strengths[trigger_idx[live]]
+
+
+def compute_effect_timeline(
+    effect_params: EffectParameters,
+    fps: int,
+    total_frames: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute the scalar per-frame effect signals for a whole video at once.
+    Each signal is an array indexed by frame number (time = frame / fps) holding the
+    same value get_effect_value_at_time() returns under that key, built with a few
+    NumPy passes over (frame, trigger) pairs instead of a trigger scan per frame.
+    Only enabled effects get signals; get_effect_value_at_time never reads the others.
+    
+    Pass the result to get_effect_value_at_time(..., timeline=, frame=) to skip its scans.
+    """
+    if total_frames is None:
+        total_frames = int(effect_params.duration * fps)
+    frame_times = np.arange(total_frames) / fps
+    timeline = {}
+    
+    # Element glow: 0.05s attack, 0.25s decay on top of a 0.3 base
+    glow = effect_params.element_glow
+    if glow.enabled:
+        shape = _PULSE_SHAPES["element_glow"]
+        glow_intensity = np.full(total_frames, 0.3)
+        frame_idx, dt, strength = _pulse_pairs(
+            frame_times, *_pulse_arrays(glow.pulse_triggers, glow.trigger_times, glow.trigger_strengths), shape.window
+        )
+        np.maximum.at(glow_intensity, frame_idx, _pulse_values(dt, strength, shape, 0.3, 0.7))
+        timeline["element_glow_intensity"] = glow_intensity * glow.intensity
+    
+    # Element scale: 0.05s attack, 0.15s ease-out
+    scale = effect_params.element_scale
+    if scale.enabled:
+        shape = _PULSE_SHAPES["element_scale"]
+        current_scale = np.full(total_frames, scale.base_scale)
+        frame_idx, dt, strength = _pulse_pairs(
+            frame_times, *_pulse_arrays(scale.triggers, scale.trigger_times, scale.trigger_strengths), shape.window
+        )
+        scale_range = scale.max_scale - scale.base_scale
+        np.maximum.at(current_scale, frame_idx, _pulse_values(dt, strength, shape, scale.base_scale, scale_range))
+        timeline["element_scale"] = current_scale
+    
+    # Neon outline: 0.03s attack, 0.22s decay on top of a 0.5 base
+    outline = effect_params.neon_outline
+    if outline.enabled:
+        shape = _PULSE_SHAPES["neon_outline"]
+        outline_intensity = np.full(total_frames, 0.5)
+        frame_idx, dt, strength = _pulse_pairs(
+            frame_times, *_pulse_arrays(outline.pulse_triggers, outline.trigger_times, outline.trigger_strengths), shape.window
+        )
+        np.maximum.at(outline_intensity, frame_idx, _pulse_values(dt, strength, shape, 0.5, 0.5))
+        timeline["neon_outline_intensity"] = outline_intensity * outline.intensity
+    
+    # Light flares: 0.05s attack, 0.35s decay
+    flares = effect_params.light_flares
+    if flares.enabled:
+        shape = _PULSE_SHAPES["light_flares"]
+        flare_intensity = np.zeros(total_frames)
+        frame_idx, dt, strength = _pulse_pairs(
+            frame_times, *_pulse_arrays(flares.triggers, flares.trigger_times, flares.trigger_strengths), shape.window
+        )
+        np.maximum.at(flare_intensity, frame_idx, _pulse_values(dt, strength, shape, 0.0, 1.0))
+        timeline["light_flares_intensity"] = flare_intensity * flares.intensity
+    
+    # Glitch: the first trigger (in list order) covering a frame sets its intensity
+    glitch = effect_params.glitch
+    if glitch.enabled:
+        glitch_intensity = np.zeros(total_frames)
+        glitch_active = np.zeros(total_frames, dtype=bool)
+        if glitch.triggers:
+            if glitch.trigger_order is not None:
+                starts, durations = glitch.trigger_times, glitch.trigger_durations
+                strengths, order = glitch.trigger_strengths, glitch.trigger_order
+            else:
+                glitch_array = np.asarray(glitch.triggers, dtype=np.float64)
+                starts, durations, strengths = glitch_array.T
+                order = np.arange(len(glitch_array))
+            frame_idx, trigger_idx = _trigger_frame_pairs(frame_times, starts, float(durations.max()))
+            times = frame_times[frame_idx]
+            live = (starts[trigger_idx] <= times) & (times < starts[trigger_idx] + durations[trigger_idx])
+            # Earliest list position among each frame's live triggers, mapped back to its sorted slot
+            first = np.full(total_frames, len(order))
+            np.minimum.at(first, frame_idx[live], order[trigger_idx[live]])
+            glitch_active = first < len(order)
+            slot = np.empty(len(order), dtype=np.intp)
+            slot[order] = np.arange(len(order))
+            glitch_intensity[glitch_active] = strengths[slot[first[glitch_active]]]
+        timeline["glitch_active"] = glitch_active
+        timeline["glitch_intensity"] = glitch_intensity
+    
+    # Strobe flash: on for flash_duration after each trigger
+    strobe = effect_params.strobe_flash
+    if strobe.enabled:
+        strobe_active = np.zeros(total_frames, dtype=bool)
+        flash_times = np.asarray(strobe.triggers, dtype=np.float64)
+        frame_idx, trigger_idx = _trigger_frame_pairs(frame_times, flash_times, strobe.flash_duration)
+        times = frame_times[frame_idx]
+        live = (flash_times[trigger_idx] <= times) & (times < flash_times[trigger_idx] + strobe.flash_duration)
+        strobe_active[frame_idx[live]] = True
+        timeline["strobe_active"] = strobe_active
+        timeline["strobe_intensity"] = np.where(strobe_active, strobe.intensity, 0)
+    
+    # Vignette pulse: 0.08s attack, 0.32s decay added to the base strength
+    vignette = effect_params.vignette_pulse
+    if vignette.enabled:
+        shape = _PULSE_SHAPES["vignette_pulse"]
+        vignette_strength = np.full(total_frames, vignette.base_strength)
+        frame_idx, dt, strength = _pulse_pairs(
+            frame_times, *_pulse_arrays(vignette.triggers, vignette.trigger_times, vignette.trigger_strengths), shape.window
+        )
+        np.maximum.at(
+            vignette_strength, frame_idx,
+            _pulse_values(dt, strength, shape, vignette.base_strength, vignette.pulse_strength)
+        )
+        timeline["vignette_strength"] = vignette_strength
+    
+    return timeline
+
+
 def get_effect_value_at_time(
     effect_params: EffectParameters,
-    time: float
-) -> Dict[str, Any]:
+    time: float,
+    timeline: Optional[Dict[str, np.ndarray]] = None,
+    frame: int = 0
+) -> FrameEffectState:
     """
     Get interpolated effect values at a specific time.
-    Used for frame-by-frame rendering.
+    Used for frame-by-frame rendering. If a compute_effect_timeline() result is
+    given, the scalar signals are read from it at `frame` instead of re-scanning triggers.
+    Values that don't change over time (colors, sizes, bounds, ...) are read
+    straight from effect_params by the renderer.
     """
-    values = {}
+    state = FrameEffectState()
     
     # ========================================================================
     # ELEMENT GLOW
     # ========================================================================
     glow = effect_params.element_glow
     if glow.enabled:
-        glow_intensity = 0.3  # Base glow
-        for trigger_time, strength in glow.pulse_triggers:
-            dt = time - trigger_time
-            if 0 <= dt < 0.3:  # Glow lasts 0.3 seconds
-                if dt < 0.05:  # Quick attack
-                    pulse = (dt / 0.05) * strength
-                else:  # Slow decay
-                    pulse = strength * (1 - (dt - 0.05) / 0.25)
-                glow_intensity = max(glow_intensity, 0.3 + pulse * 0.7)
-        values["element_glow_intensity"] = glow_intensity * glow.intensity
-        values["element_glow_radius"] = glow.radius
-        values["element_glow_color"] = glow.color
-    else:
-        values["element_glow_intensity"] = 0
+        if timeline is not None:
+            state.element_glow_intensity = float(timeline["element_glow_intensity"][frame])
+        else:
+            # 0.3 base glow; pulses last 0.3s (quick 0.05s attack, slow decay)
+            glow_intensity = _envelope_at(
+                glow.pulse_triggers, glow.trigger_times, glow.trigger_strengths, time,
+                _PULSE_SHAPES["element_glow"], 0.3, 0.7
+            )
+            state.element_glow_intensity = glow_intensity * glow.intensity
     
     # ========================================================================
     # ELEMENT SCALE
     # ========================================================================
     scale = effect_params.element_scale
     if scale.enabled:
-        current_scale = scale.base_scale
-        for trigger_time, strength in scale.triggers:
-            dt = time - trigger_time
-            if 0 <= dt < 0.2:  # Scale pulse lasts 0.2 seconds
-                if dt < 0.05:  # Quick attack
-                    scale_add = (dt / 0.05) * (scale.max_scale - scale.base_scale) * strength
-                else:  # Ease out decay
-                    progress = (dt - 0.05) / 0.15
-                    scale_add = (1 - progress * progress) * (scale.max_scale - scale.base_scale) * strength
-                current_scale = max(current_scale, scale.base_scale + scale_add)
-        values["element_scale"] = current_scale
-    else:
-        values["element_scale"] = 1.0
+        if timeline is not None:
+            state.element_scale = float(timeline["element_scale"][frame])
+        else:
+            # Scale pulse lasts 0.2s (quick 0.05s attack, ease-out decay)
+            current_scale = _envelope_at(
+                scale.triggers, scale.trigger_times, scale.trigger_strengths, time,
+                _PULSE_SHAPES["element_scale"], scale.base_scale, scale.max_scale - scale.base_scale
+            )
+            state.element_scale = current_scale
     
     # ========================================================================
     # NEON OUTLINE
     # ========================================================================
     outline = effect_params.neon_outline
     if outline.enabled:
-        outline_intensity = 0.5  # Base intensity
-        for trigger_time, strength in outline.pulse_triggers:
-            dt = time - trigger_time
-            if 0 <= dt < 0.25:
-                if dt < 0.03:
-                    pulse = (dt / 0.03)
-                else:
-                    pulse = 1 - (dt - 0.03) / 0.22
-                outline_intensity = max(outline_intensity, 0.5 + pulse * 0.5 * strength)
-        values["neon_outline_intensity"] = outline_intensity * outline.intensity
-        values["neon_outline_color"] = outline.color
-        values["neon_outline_width"] = outline.width
-        values["neon_outline_glow"] = outline.glow_radius
-    else:
-        values["neon_outline_intensity"] = 0
-    
-    # ========================================================================
-    # ECHO TRAIL
-    # ========================================================================
-    echo = effect_params.echo_trail
-    values["echo_trail_enabled"] = echo.enabled
-    values["echo_trail_count"] = echo.trail_count if echo.enabled else 0
-    values["echo_trail_spacing"] = echo.trail_spacing
-    values["echo_trail_decay"] = echo.opacity_decay
-    values["echo_trail_intensity"] = echo.intensity if echo.enabled else 0
+        if timeline is not None:
+            state.neon_outline_intensity = float(timeline["neon_outline_intensity"][frame])
+        else:
+            # 0.5 base intensity; pulses last 0.25s
+            outline_intensity = _envelope_at(
+                outline.pulse_triggers, outline.trigger_times, outline.trigger_strengths, time,
+                _PULSE_SHAPES["neon_outline"], 0.5, 0.5
+            )
+            state.neon_outline_intensity = outline_intensity * outline.intensity
     
     # ========================================================================
     # PARTICLE BURST
@@ -778,208 +1256,122 @@ def get_effect_value_at_time(
     burst = effect_params.particle_burst
     if burst.enabled:
         # Check for active bursts
-        active_bursts = []
-        for trigger_time, strength in burst.triggers:
-            dt = time - trigger_time
-            if 0 <= dt < burst.lifetime:
-                progress = dt / burst.lifetime
-                active_bursts.append({
-                    "progress": progress,
-                    "strength": strength,
-                    "bounds_x": burst.bounds_x,
-                    "bounds_y": burst.bounds_y,
-                    "bounds_w": burst.bounds_w,
-                    "bounds_h": burst.bounds_h
-                })
-        values["particle_bursts"] = active_bursts
-        values["particle_burst_params"] = {
-            "count": burst.particle_count,
-            "colors": burst.colors,
-            "size_range": burst.size_range,
-            "speed": burst.speed,
-            "intensity": burst.intensity
-        }
-    else:
-        values["particle_bursts"] = []
-    
-    # ========================================================================
-    # ENERGY TRAILS
-    # ========================================================================
-    trails = effect_params.energy_trails
-    if trails.enabled:
-        values["energy_trails_enabled"] = True
-        values["energy_trails_params"] = {
-            "count": trails.trail_count,
-            "colors": trails.colors,
-            "width": trails.width,
-            "bounds_x": trails.bounds_x,
-            "bounds_y": trails.bounds_y,
-            "bounds_w": trails.bounds_w,
-            "bounds_h": trails.bounds_h,
-            "speed": trails.speed,
-            "time": time,
-            "intensity": trails.intensity
-        }
-    else:
-        values["energy_trails_enabled"] = False
+        times, strengths = _pulse_arrays(burst.triggers, burst.trigger_times, burst.trigger_strengths)
+        lo, hi = _window_bounds(times, time, burst.lifetime)
+        if hi > lo:
+            dt = time - times[lo:hi]
+            active = (dt >= 0) & (dt < burst.lifetime)
+            state.particle_burst_progress = dt[active] / burst.lifetime
+            state.particle_burst_strength = strengths[lo:hi][active]
     
     # ========================================================================
     # LIGHT FLARES
     # ========================================================================
     flares = effect_params.light_flares
     if flares.enabled:
-        flare_intensity = 0
-        for trigger_time, strength in flares.triggers:
-            dt = time - trigger_time
-            if 0 <= dt < 0.4:
-                if dt < 0.05:
-                    pulse = dt / 0.05
-                else:
-                    pulse = 1 - (dt - 0.05) / 0.35
-                flare_intensity = max(flare_intensity, pulse * strength)
-        values["light_flares_intensity"] = flare_intensity * flares.intensity
-        values["light_flares_points"] = flares.flare_points
-        values["light_flares_size"] = flares.size
-        values["light_flares_colors"] = flares.colors
-    else:
-        values["light_flares_intensity"] = 0
+        if timeline is not None:
+            state.light_flares_intensity = float(timeline["light_flares_intensity"][frame])
+        else:
+            # Flares last 0.4s
+            flare_intensity = _envelope_at(
+                flares.triggers, flares.trigger_times, flares.trigger_strengths, time,
+                _PULSE_SHAPES["light_flares"], 0.0, 1.0
+            )
+            state.light_flares_intensity = flare_intensity * flares.intensity
     
     # ========================================================================
     # GLITCH
     # ========================================================================
     glitch = effect_params.glitch
     if glitch.enabled:
-        glitch_active = False
-        glitch_intensity = 0
-        for trigger_time, duration, strength in glitch.triggers:
-            if trigger_time <= time < trigger_time + duration:
-                glitch_active = True
-                glitch_intensity = strength
-                break
-        values["glitch_active"] = glitch_active
-        values["glitch_intensity"] = glitch_intensity
-        values["glitch_chromatic"] = glitch.chromatic_aberration * glitch_intensity if glitch_active else 0
-        values["glitch_rgb_split"] = glitch.rgb_split * glitch_intensity if glitch_active else 0
-        values["glitch_scan_lines"] = glitch.scan_lines and glitch_active
-        values["glitch_scan_opacity"] = glitch.scan_line_opacity if glitch_active else 0
-        values["glitch_slice"] = glitch.slice_displacement and glitch_active
-    else:
-        values["glitch_active"] = False
-        values["glitch_intensity"] = 0
+        if timeline is not None:
+            glitch_active = bool(timeline["glitch_active"][frame])
+            glitch_intensity = float(timeline["glitch_intensity"][frame]) if glitch_active else 0
+        else:
+            glitch_active = False
+            glitch_intensity = 0
+            if glitch.trigger_order is not None:
+                live = _first_live_trigger(
+                    time, glitch.trigger_times, glitch.trigger_durations, glitch.trigger_order, glitch.max_duration
+                )
+                if live >= 0:
+                    glitch_active = True
+                    glitch_intensity = float(glitch.trigger_strengths[live])
+            else:
+                for trigger_time, duration, strength in glitch.triggers:
+                    if trigger_time <= time < trigger_time + duration:
+                        glitch_active = True
+                        glitch_intensity = strength
+                        break
+        if glitch_active:
+            state.glitch_active = True
+            state.glitch_intensity = glitch_intensity
+            state.glitch_chromatic = glitch.chromatic_aberration * glitch_intensity
+            state.glitch_rgb_split = glitch.rgb_split * glitch_intensity
+            state.glitch_scan_lines = glitch.scan_lines
+            state.glitch_scan_opacity = glitch.scan_line_opacity
+            state.glitch_slice = glitch.slice_displacement
     
     # ========================================================================
     # RIPPLE WAVE
     # ========================================================================
     ripple = effect_params.ripple_wave
     if ripple.enabled:
-        active_ripples = []
-        for trigger_time, strength in ripple.triggers:
-            dt = time - trigger_time
-            if 0 <= dt < 2.0:  # Ripples last 2 seconds
-                radius = dt * ripple.speed
-                fade = 1 - dt / 2.0
-                active_ripples.append({
-                    "radius": radius,
-                    "amplitude": ripple.amplitude * strength * fade,
-                    "wavelength": ripple.wavelength,
-                    "bounds_x": ripple.bounds_x,
-                    "bounds_y": ripple.bounds_y,
-                    "bounds_w": ripple.bounds_w,
-                    "bounds_h": ripple.bounds_h
-                })
-        values["ripple_waves"] = active_ripples
-        values["ripple_intensity"] = ripple.intensity
-    else:
-        values["ripple_waves"] = []
-    
-    # ========================================================================
-    # FILM GRAIN
-    # ========================================================================
-    grain = effect_params.film_grain
-    values["film_grain_enabled"] = grain.enabled
-    values["film_grain_intensity"] = grain.intensity if grain.enabled else 0
-    values["film_grain_size"] = grain.grain_size
-    values["film_grain_color_var"] = grain.color_variation
+        times, strengths = _pulse_arrays(ripple.triggers, ripple.trigger_times, ripple.trigger_strengths)
+        lo, hi = _window_bounds(times, time, 2.0)
+        if hi > lo:
+            dt = time - times[lo:hi]
+            active = (dt >= 0) & (dt < 2.0)  # Ripples last 2 seconds
+            dt = dt[active]
+            state.ripple_radii = dt * ripple.speed
+            state.ripple_amplitudes = ripple.amplitude * strengths[lo:hi][active] * (1 - dt / 2.0)
     
     # ========================================================================
     # STROBE FLASH
     # ========================================================================
     strobe = effect_params.strobe_flash
     if strobe.enabled:
-        flash_active = False
-        for trigger_time in strobe.triggers:
-            if trigger_time <= time < trigger_time + strobe.flash_duration:
-                flash_active = True
-                break
-        values["strobe_active"] = flash_active
-        values["strobe_intensity"] = strobe.intensity if flash_active else 0
-        values["strobe_color"] = strobe.color
-    else:
-        values["strobe_active"] = False
-        values["strobe_intensity"] = 0
+        if timeline is not None:
+            flash_active = bool(timeline["strobe_active"][frame])
+        else:
+            # Flashes are in beat order and share one duration, so only the latest
+            # flash starting at or before `time` can still be lit
+            i = bisect_right(strobe.triggers, time) - 1
+            flash_active = i >= 0 and time < strobe.triggers[i] + strobe.flash_duration
+        if flash_active:
+            state.strobe_active = True
+            state.strobe_intensity = strobe.intensity
     
     # ========================================================================
     # VIGNETTE PULSE
     # ========================================================================
     vignette = effect_params.vignette_pulse
     if vignette.enabled:
-        vignette_strength = vignette.base_strength
-        for trigger_time, strength in vignette.triggers:
-            dt = time - trigger_time
-            if 0 <= dt < 0.4:  # Slightly longer duration for visibility
-                if dt < 0.08:  # Slightly longer attack
-                    pulse = dt / 0.08
-                else:  # Slower decay
-                    pulse = 1 - (dt - 0.08) / 0.32
-                # Apply pulse additively with full strength
-                pulse_amount = vignette.pulse_strength * pulse * (0.5 + strength * 0.5)
-                vignette_strength = max(vignette_strength, vignette.base_strength + pulse_amount)
-        values["vignette_strength"] = vignette_strength
-    else:
-        values["vignette_strength"] = 0
-    
-    # ========================================================================
-    # BACKGROUND DIM
-    # ========================================================================
-    bg_dim = effect_params.background_dim
-    values["background_dim_enabled"] = bg_dim.enabled
-    values["background_dim_amount"] = bg_dim.dim_amount if bg_dim.enabled else 0
-    values["background_blur"] = bg_dim.blur_amount if bg_dim.enabled else 0
-    
-    # ========================================================================
-    # SUBJECT BOUNDS (for masking)
-    # ========================================================================
-    values["subject_bounds"] = {
-        "x": effect_params.subject_bounds.x,
-        "y": effect_params.subject_bounds.y,
-        "w": effect_params.subject_bounds.w,
-        "h": effect_params.subject_bounds.h,
-        "center_x": effect_params.subject_bounds.center_x,
-        "center_y": effect_params.subject_bounds.center_y
-    }
+        if timeline is not None:
+            state.vignette_strength = float(timeline["vignette_strength"][frame])
+        else:
+            # Slightly longer pulses (0.08s attack, 0.4s total) for visibility,
+            # applied additively with at least half strength
+            vignette_strength = _envelope_at(
+                vignette.triggers, vignette.trigger_times, vignette.trigger_strengths, time,
+                _PULSE_SHAPES["vignette_pulse"], vignette.base_strength, vignette.pulse_strength
+            )
+            state.vignette_strength = vignette_strength
     
-    return values
+    return state
 
 
 def toggles_from_dict(data: Dict[str, Any]) -> EffectToggles:
     """Create EffectToggles from a dictionary (e.g., from JSON request)."""
     toggles = EffectToggles()
+    enabled, intensity = toggles.enabled, toggles.intensity
     
-    effect_names = [
-        "element_glow", "element_scale", "neon_outline", "echo_trail",
-        "particle_burst", "energy_trails", "light_flares",
-        "glitch", "ripple_wave", "film_grain", "strobe_flash", "vignette_pulse",
-        "background_dim"
-    ]
-    
-    for name in effect_names:
-        if name in data:
-            effect_data = data[name]
-            toggle = EffectToggle(
-                enabled=effect_data.get("enabled", False),
-                intensity=effect_data.get("intensity", 0.5)
-            )
-            setattr(toggles, name, toggle)
+    # Write straight into the packed arrays; no per-effect EffectToggle or setattr dispatch
+    for name, idx in TOGGLE_INDEX.items():
+        effect_data = data.get(name)
+        if effect_data is not None:
+            enabled[idx] = effect_data.get("enabled", False)
+            intensity[idx] = effect_data.get("intensity", 0.5)
     
     return toggles
 
@@ -1008,6 +1400,30 @@ def image_context_from_dict(data: Dict[str, Any]) -> ImageContext:
 
 
 # Legacy support - map old settings to new toggles
+# (toggle, slider, threshold, scale): enabled when slider > threshold, intensity = slider * scale.
+# Sliders: 0 = motion intensity, 1 = beat reactivity, 2 = energy level
+_LEGACY_TOGGLE_MAP: Tuple[Tuple[str, int, float, float], ...] = (
+    # Motion intensity -> movement-related effects
+    ("element_scale", 0, 0.2, 1.0),
+    ("echo_trail", 0, 0.5, 0.7),
+    ("ripple_wave", 0, 0.6, 0.6),
+    # Beat reactivity -> beat-triggered effects
+    ("element_glow", 1, 0.2, 1.0),
+    ("particle_burst", 1, 0.3, 1.0),
+    ("vignette_pulse", 1, 0.2, 0.8),
+    # Energy level -> intensity-related effects
+    ("neon_outline", 2, 0.6, 1.0),
+    ("glitch", 2, 0.7, 0.5),
+    ("strobe_flash", 2, 0.8, 0.4),
+    ("light_flares", 2, 0.5, 0.6),
+    ("energy_trails", 2, 0.4, 0.5),
+)
+_LEGACY_TOGGLE_INDEX = np.array([TOGGLE_INDEX[name] for name, _, _, _ in _LEGACY_TOGGLE_MAP])
+_LEGACY_SLIDER = np.array([slider for _, slider, _, _ in _LEGACY_TOGGLE_MAP])
+_LEGACY_THRESHOLD = np.array([threshold for _, _, threshold, _ in _LEGACY_TOGGLE_MAP])
+_LEGACY_SCALE = np.array([scale for _, _, _, scale in _LEGACY_TOGGLE_MAP])
+
+
 def legacy_settings_to_toggles(
     motion_intensity: float,
     beat_reactivity: float,
@@ -1019,22 +1435,10 @@ def legacy_settings_to_toggles(
     """
     toggles = EffectToggles()
     
-    # Map motion intensity to movement-related effects
-    toggles.element_scale = EffectToggle(motion_intensity > 0.2, motion_intensity)
-    toggles.echo_trail = EffectToggle(motion_intensity > 0.5, motion_intensity * 0.7)
-    toggles.ripple_wave = EffectToggle(motion_intensity > 0.6, motion_intensity * 0.6)
-    
-    # Map beat reactivity to beat-triggered effects
-    toggles.element_glow = EffectToggle(beat_reactivity > 0.2, beat_reactivity)
-    toggles.particle_burst = EffectToggle(beat_reactivity > 0.3, beat_reactivity)
-    toggles.vignette_pulse = EffectToggle(beat_reactivity > 0.2, beat_reactivity * 0.8)
-    
-    # Map energy level to intensity-related effects
-    toggles.neon_outline = EffectToggle(energy_level > 0.6, energy_level)
-    toggles.glitch = EffectToggle(energy_level > 0.7, energy_level * 0.5)
-    toggles.strobe_flash = EffectToggle(energy_level > 0.8, energy_level * 0.4)
-    toggles.light_flares = EffectToggle(energy_level > 0.5, energy_level * 0.6)
-    toggles.energy_trails = EffectToggle(energy_level > 0.4, energy_level * 0.5)
+    # Threshold/scale every slider-driven toggle in one pass over the packed arrays
+    sliders = np.array([motion_intensity, beat_reactivity, energy_level], dtype=np.float64)[_LEGACY_SLIDER]
+    toggles.enabled[_LEGACY_TOGGLE_INDEX] = sliders > _LEGACY_THRESHOLD
+    toggles.intensity[_LEGACY_TOGGLE_INDEX] = sliders * _LEGACY_SCALE
     
     # Background always on at moderate level
     toggles.background_dim = EffectToggle(True, 0.3 + energy_level * 0.3)
@@ -8,25 +8,38 @@ Usage:
     python generate_demos.py              # Generate all videos (effects + presets)
     python generate_demos.py --effects    # Generate only 13 single effects
     python generate_demos.py --presets    # Generate only curated presets
+    python generate_demos.py --no-cache   # Re-run audio analysis instead of using the cache
+    python generate_demos.py --force      # Re-render videos that already exist
+    python generate_demos.py --only preset_synthwave glitch --force  # Re-render just these
+    python generate_demos.py --list-presets  # List preset keys without rendering
 """
 
 import argparse
 import json
 import os
+import subprocess
 import sys
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, Tuple
+
+# orjson is optional; the manifest falls back to the stdlib encoder without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from audio_analysis import analyze_audio
-from effect_engine import (
-    EffectToggles, EffectToggle, ImageContext, SubjectBounds,
-    calculate_effect_parameters
-)
-from video_renderer import render_video, RenderSettings, AspectRatio
+# The pipeline modules pull in librosa/numba (~0.4s), so they're imported where
+# they're used; --help and --list-* stay instant.
+if TYPE_CHECKING:
+    from effect_engine import EffectToggles, ImageContext
 
 
 # Configuration
@@ -34,7 +47,7 @@ AUDIO_START_TIME = 63.0  # Start at 1:03
 DURATION = 30.0          # 30 second clips
 INTENSITY = 0.9          # 90% intensity - triggers on most beats while filtering weakest
 FPS = 24                 # Preview quality FPS
-ASPECT_RATIO = AspectRatio.VERTICAL  # 9:16 for demos
+ASPECT_RATIO = "9:16"    # AspectRatio.VERTICAL for demos
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
@@ -163,6 +176,12 @@ SINGLE_EFFECTS = [
 ]
 
 
+# Keys of every effect, in SINGLE_EFFECTS order
+EFFECT_KEYS: Tuple[str, ...] = tuple(effect.key for effect in SINGLE_EFFECTS)
+if len(EFFECT_KEYS) != 13:
+    raise ValueError(f"Expected 13 single effects, found {len(EFFECT_KEYS)}")
+
+
 # 30 Curated Presets - combinations of effects for different styles
 PRESETS = [
     # === GENRE/MOOD PRESETS ===
@@ -413,124 +432,224 @@ PRESETS = [
 ]
 
 
-def create_single_effect_toggles(effect_key: str) -> EffectToggles:
-    """Create toggles with only one effect enabled at max intensity."""
-    toggles = EffectToggles()
-    
-    # Disable all effects first
-    for attr_name in [
-        "element_glow", "element_scale", "neon_outline", "echo_trail",
-        "particle_burst", "energy_trails", "light_flares",
-        "glitch", "ripple_wave", "film_grain", "strobe_flash", "vignette_pulse",
-        "background_dim"
-    ]:
-        setattr(toggles, attr_name, EffectToggle(enabled=False, intensity=0.0))
-    
-    # Enable only the target effect at max intensity
-    setattr(toggles, effect_key, EffectToggle(enabled=True, intensity=INTENSITY))
-    
-    return toggles
-
+# Fail fast on preset typos instead of discovering them mid-render
+_unknown_preset_effects = {
+    f"{preset.key}.{effect_key}"
+    for preset in PRESETS for effect_key in preset.effects
+    if effect_key not in EFFECT_KEYS
+}
+if _unknown_preset_effects:
+    raise ValueError(f"Unknown effects in presets: {sorted(_unknown_preset_effects)}")
 
-def create_preset_toggles(effects_dict: dict) -> EffectToggles:
-    """Create toggles from a preset's effects dictionary."""
-    toggles = EffectToggles()
-    
-    # Disable all effects first
-    for attr_name in [
-        "element_glow", "element_scale", "neon_outline", "echo_trail",
-        "particle_burst", "energy_trails", "light_flares",
-        "glitch", "ripple_wave", "film_grain", "strobe_flash", "vignette_pulse",
-        "background_dim"
-    ]:
-        setattr(toggles, attr_name, EffectToggle(enabled=False, intensity=0.0))
-    
-    # Enable effects from the preset with their specified intensities
-    for effect_key, intensity in effects_dict.items():
-        setattr(toggles, effect_key, EffectToggle(enabled=True, intensity=intensity))
-    
-    return toggles
+# Two demos with the same (effect, intensity) set would render the same video twice
+_demo_configs = [frozenset({effect.key: INTENSITY}.items()) for effect in SINGLE_EFFECTS] + \
+                [frozenset(preset.effects.items()) for preset in PRESETS]
+if len(set(_demo_configs)) != len(_demo_configs):
+    raise ValueError("Two demos have identical effects")
 
 
-def generate_demo_video(key: str, name: str, toggles: EffectToggles, audio_features, image_path: str, audio_path: str) -> str:
-    """Generate a demo video with the given toggles configuration."""
-    output_path = DEMOS_OUTPUT_DIR / f"{key}.mp4"
-    
-    print(f"  Generating {name}...")
+@lru_cache(maxsize=None)
+def default_image_context() -> "ImageContext":
+    """Image context shared by every demo (centered subject, fixed palette)."""
+    from effect_engine import ImageContext, SubjectBounds
     
-    # Default image context (centered subject)
-    image_context = ImageContext(
+    return ImageContext(
         bounds=SubjectBounds(x=0.2, y=0.2, w=0.6, h=0.6),
         colors=["#FFD700", "#FF6B35", "#4ECDC4", "#9B59B6"],
         mood="energetic"
     )
+
+
+def create_single_effect_toggles(effect_key: str) -> "EffectToggles":
+    """Create toggles with only one effect enabled at max intensity."""
+    return create_preset_toggles({effect_key: INTENSITY})
+
+
+def create_preset_toggles(effects_dict: dict) -> "EffectToggles":
+    """Create toggles from a preset's effects dictionary (everything else switched off)."""
+    from effect_engine import EffectToggles, EffectToggle
+    
+    return EffectToggles(**{
+        attr_name: EffectToggle(enabled=attr_name in effects_dict, intensity=effects_dict.get(attr_name, 0.0))
+        for attr_name in EFFECT_KEYS
+    })
+
+
+def is_rendered(key: str) -> bool:
+    """True if a finished (non-empty) demo video already exists for this key."""
+    output_path = DEMOS_OUTPUT_DIR / f"{key}.mp4"
+    return output_path.exists() and output_path.stat().st_size > 0
+
+
+# Every possible progress bar, indexed by the number of filled cells
+_PROGRESS_BAR_LENGTH = 30
+_PROGRESS_BARS = tuple(
+    "█" * filled + "░" * (_PROGRESS_BAR_LENGTH - filled)
+    for filled in range(_PROGRESS_BAR_LENGTH + 1)
+)
+
+
+def generate_demo_video(key: str, name: str, toggles: "EffectToggles", audio_features, image_path: str, audio_path: str,
+                        show_progress: bool = True, image_context: "ImageContext" = None,
+                        encoder: str = "libx264", audio_start: float = AUDIO_START_TIME) -> str:
+    """Generate a demo video with the given toggles configuration."""
+    from effect_engine import calculate_effect_parameters
+    from video_renderer import render_video, RenderSettings, AspectRatio
+    
+    image_context = image_context or default_image_context()
+    output_path = DEMOS_OUTPUT_DIR / f"{key}.mp4"
+    
+    if show_progress:
+        print(f"  Generating {name}...")
     
     # Calculate effect parameters
     effect_params = calculate_effect_parameters(audio_features, toggles, image_context)
     
     # Render settings
     render_settings = RenderSettings(
-        aspect_ratio=ASPECT_RATIO,
+        aspect_ratio=AspectRatio(ASPECT_RATIO),
         fps=FPS,
         quality="medium",
         duration=DURATION,
-        preview=True  # Use preview quality for faster generation
+        preview=True,  # Use preview quality for faster generation
+        encoder=encoder
     )
     
-    # Progress callback
-    def progress_callback(progress: float):
-        bar_length = 30
-        filled = int(bar_length * progress)
-        bar = "█" * filled + "░" * (bar_length - filled)
-        print(f"\r  [{bar}] {int(progress * 100)}%", end="", flush=True)
-    
-    # Render the video
-    render_video(
-        image_path=str(image_path),
-        audio_path=str(audio_path),
-        output_path=str(output_path),
-        effect_params=effect_params,
-        render_settings=render_settings,
-        audio_start=AUDIO_START_TIME,
-        progress_callback=progress_callback
-    )
+    # Progress callback (called every frame; only redraws when the percentage changes)
+    last_percent = [-1]
     
-    print()  # New line after progress bar
+    def progress_callback(progress: float):
+        percent = int(progress * 100)
+        if percent == last_percent[0]:
+            return
+        last_percent[0] = percent
+        bar = _PROGRESS_BARS[int(_PROGRESS_BAR_LENGTH * progress)]
+        print(f"\r  [{bar}] {percent}%", end="", flush=True)
+    
+    # Render to a temporary name and rename on success, so an interrupted run
+    # never leaves a truncated file that a later run would treat as finished
+    partial_path = output_path.with_suffix(".partial.mp4")
+    try:
+        render_video(
+            image_path=str(image_path),
+            audio_path=str(audio_path),
+            output_path=str(partial_path),
+            effect_params=effect_params,
+            render_settings=render_settings,
+            audio_start=audio_start,
+            progress_callback=progress_callback if show_progress else None
+        )
+        os.replace(partial_path, output_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    
+    if show_progress:
+        print()  # New line after progress bar
     return str(output_path)
 
 
+def extract_audio_clip(output_path: Path) -> Path:
+    """
+    Decode the demo audio window once to float PCM WAV, so each render's mux
+    reads it directly instead of seeking into and decoding the MP3 again.
+    """
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-ss", str(AUDIO_START_TIME),
+        "-t", str(DURATION),
+        "-i", str(AUDIO_FILE),
+        "-c:a", "pcm_f32le",
+        str(output_path)
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return output_path
+
+
+# Render inputs shared by every render in a worker process (set once per worker)
+_worker_audio_features = None
+_worker_encoder = "libx264"
+_worker_audio_path: Path = AUDIO_FILE
+_worker_audio_start = AUDIO_START_TIME
+
+
+def _init_worker(audio_features, encoder: str, audio_path: Path, audio_start: float):
+    """Process pool initializer: receive the analyzed audio, encoder, and audio clip once per worker."""
+    global _worker_audio_features, _worker_encoder, _worker_audio_path, _worker_audio_start
+    _worker_audio_features = audio_features
+    _worker_encoder = encoder
+    _worker_audio_path = audio_path
+    _worker_audio_start = audio_start
+
+
+def _render_one(key: str, name: str, effects: dict, is_preset: bool) -> str:
+    """Render one demo inside a worker process. Top-level so it can be pickled."""
+    if is_preset:
+        toggles = create_preset_toggles(effects)
+    else:
+        toggles = create_single_effect_toggles(key)
+    # Per-frame progress bars from concurrent workers would interleave, so report per video instead
+    return generate_demo_video(key, name, toggles, _worker_audio_features, IMAGE_FILE, _worker_audio_path,
+                               show_progress=False, encoder=_worker_encoder, audio_start=_worker_audio_start)
+
+
 def generate_manifest(single_effects: list, presets: list) -> Dict[str, Any]:
     """Generate the manifest.json file."""
-    manifest = {
+    return {
         "version": "2.0",
         "audio_start_time": AUDIO_START_TIME,
         "duration": DURATION,
-        "single_effects": [],
-        "presets": []
+        "single_effects": [
+            {
+                "key": effect.key,
+                "name": effect.name,
+                "description": effect.description,
+                "category": effect.category,
+                "explanation": effect.explanation,
+                "video_url": f"/demos/{effect.key}.mp4"
+            }
+            for effect in single_effects
+        ],
+        "presets": [
+            {
+                "key": preset.key,
+                "name": preset.name,
+                "description": preset.description,
+                "category": preset.category,
+                "explanation": preset.explanation,
+                "effects": preset.effects,
+                "video_url": f"/demos/{preset.key}.mp4"
+            }
+            for preset in presets
+        ]
     }
-    
-    for effect in single_effects:
-        manifest["single_effects"].append({
-            "key": effect.key,
-            "name": effect.name,
-            "description": effect.description,
-            "category": effect.category,
-            "explanation": effect.explanation,
-            "video_url": f"/demos/{effect.key}.mp4"
-        })
-    
-    for preset in presets:
-        manifest["presets"].append({
-            "key": preset.key,
-            "name": preset.name,
-            "description": preset.description,
-            "category": preset.category,
-            "explanation": preset.explanation,
-            "effects": preset.effects,
-            "video_url": f"/demos/{preset.key}.mp4"
-        })
-    
-    return manifest
+
+
+def write_manifest(manifest: Dict[str, Any], path: Path):
+    """Write the manifest as indented JSON, using orjson when it's installed."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+def update_manifest() -> Path:
+    """
+    Rewrite manifest.json to list every demo whose video exists on disk.
+    Written atomically, so it's called after each finished render: a crash keeps
+    the completed videos discoverable, and partial runs (--only, -e, -p) keep the
+    entries for videos rendered earlier.
+    """
+    manifest = generate_manifest(
+        [effect for effect in SINGLE_EFFECTS if is_rendered(effect.key)],
+        [preset for preset in PRESETS if is_rendered(preset.key)]
+    )
+    manifest_path = DEMOS_OUTPUT_DIR / "manifest.json"
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    write_manifest(manifest, tmp_path)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
 
 
 def main():
@@ -545,6 +664,10 @@ Examples:
     python generate_demos.py -e           # Same as --effects
     python generate_demos.py --presets    # Generate only curated presets
     python generate_demos.py -p           # Same as --presets
+    python generate_demos.py --no-cache   # Re-run audio analysis instead of using the cache
+    python generate_demos.py --force      # Re-render videos that already exist
+    python generate_demos.py --only preset_synthwave glitch --force
+                                          # Re-render just the listed demos
         """
     )
     parser.add_argument(
@@ -557,8 +680,70 @@ Examples:
         action="store_true",
         help="Generate only the curated preset demos"
     )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="KEY",
+        help="Generate only these demos (single effect or preset keys; see --list-effects/--list-presets)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help="Number of videos to render in parallel (default: half the CPU cores, "
+             "leaving headroom for ffmpeg's own threads)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute the audio analysis instead of loading it from the on-disk cache"
+    )
+    parser.add_argument(
+        "-f", "--force",
+        action="store_true",
+        help="Re-render demos even if their video already exists"
+    )
+    parser.add_argument(
+        "--encoder",
+        default="auto",
+        choices=["auto", "libx264", "h264_nvenc", "hevc_nvenc", "h264_videotoolbox"],
+        help="Video encoder (default: auto = NVENC/VideoToolbox if usable, else libx264)"
+    )
+    parser.add_argument(
+        "--list-effects",
+        action="store_true",
+        help="List the single effect keys and exit"
+    )
+    parser.add_argument(
+        "--list-presets",
+        action="store_true",
+        help="List the preset keys and their effects, then exit"
+    )
     args = parser.parse_args()
     
+    if args.list_effects or args.list_presets:
+        if args.list_effects:
+            for effect in SINGLE_EFFECTS:
+                print(f"{effect.key:<20} {effect.name} - {effect.description}")
+        if args.list_presets:
+            for preset in PRESETS:
+                print(f"{preset.key:<26} {preset.name} - {', '.join(preset.effects)}")
+        return
+    
+    if args.only:
+        known_keys = set(EFFECT_KEYS) | {preset.key for preset in PRESETS}
+        unknown_keys = sorted(set(args.only) - known_keys)
+        if unknown_keys:
+            parser.error(f"unknown demo key(s): {', '.join(unknown_keys)}")
+    
+    # Heavy imports only once we're actually rendering
+    from audio_analysis import analyze_audio
+    from effect_engine import TOGGLE_NAMES
+    from video_renderer import resolve_encoder
+    
+    if set(EFFECT_KEYS) != set(TOGGLE_NAMES):
+        raise SystemExit("SINGLE_EFFECTS is out of sync with effect_engine.TOGGLE_NAMES")
+    
     # If neither flag is set, generate both
     generate_effects = args.effects or (not args.effects and not args.presets)
     generate_presets = args.presets or (not args.effects and not args.presets)
@@ -574,6 +759,8 @@ Examples:
         print("\nMode: Curated Presets Only")
     else:
         print("\nMode: All Videos (Effects + Presets)")
+    if args.only:
+        print(f"Only: {', '.join(args.only)}")
     
     # Verify demo assets exist
     if not IMAGE_FILE.exists():
@@ -583,10 +770,19 @@ Examples:
         print(f"ERROR: Demo audio not found: {AUDIO_FILE}")
         sys.exit(1)
     
+    # Flat work list: (key, name, effects, is_preset)
+    work = []
+    if generate_effects:
+        work += [(effect.key, effect.name, {effect.key: INTENSITY}, False) for effect in SINGLE_EFFECTS]
+    if generate_presets:
+        work += [(preset.key, preset.name, preset.effects, True) for preset in PRESETS]
+    if args.only:
+        work = [item for item in work if item[0] in args.only]
+    
     # Calculate total videos based on flags
-    effects_count = len(SINGLE_EFFECTS) if generate_effects else 0
-    presets_count = len(PRESETS) if generate_presets else 0
-    total_videos = effects_count + presets_count
+    presets_count = sum(1 for item in work if item[3])
+    effects_count = len(work) - presets_count
+    total_videos = len(work)
     
     print(f"\nDemo assets:")
     print(f"  Image: {IMAGE_FILE.name}")
@@ -595,74 +791,90 @@ Examples:
     print(f"  Audio start: {AUDIO_START_TIME}s (1:03)")
     print(f"  Duration: {DURATION}s")
     print(f"  Output: {DEMOS_OUTPUT_DIR}")
+    # Probe once here rather than in every worker
+    encoder = resolve_encoder(args.encoder)
+    print(f"  Encoder: {encoder}")
     print(f"\nVideos to generate:")
     if generate_effects:
-        print(f"  Single effects: {len(SINGLE_EFFECTS)}")
+        print(f"  Single effects: {effects_count}")
     if generate_presets:
-        print(f"  Curated presets: {len(PRESETS)}")
+        print(f"  Curated presets: {presets_count}")
     print(f"  Total: {total_videos}")
     
     # Create output directory
     DEMOS_OUTPUT_DIR.mkdir(exist_ok=True)
     
-    # Analyze audio once (reused for all effects)
+    # Analyze audio once (reused for all effects). Results are memoized on disk
+    # by file identity and region, so re-runs skip the librosa pass entirely.
     print(f"\nAnalyzing audio...")
     audio_features = analyze_audio(
         str(AUDIO_FILE),
         start_time=AUDIO_START_TIME,
-        duration=DURATION
+        duration=DURATION,
+        use_cache=not args.no_cache
     )
     print(f"  Tempo: {audio_features.tempo:.1f} BPM")
     print(f"  Beats detected: {len(audio_features.beat_times)}")
     
-    current = 0
+    # Renders are deterministic, so existing videos can be reused unless --force
+    if not args.force:
+        pending = []
+        for item in work:
+            if is_rendered(item[0]):
+                print(f"  ✓ Cached: {item[0]}.mp4 ({item[1]})")
+            else:
+                pending.append(item)
+        work = pending
+    
+    to_render = len(work)
+    jobs = max(1, min(args.jobs, to_render))
+    print(f"\n{'='*60}")
+    print(f"Rendering {to_render} videos ({jobs} parallel job{'s' if jobs != 1 else ''})")
+    print("=" * 60)
     
-    # Generate videos for single effects
-    if generate_effects:
-        print(f"\n{'='*60}")
-        print("PART 1: Single Effects (13 videos)")
-        print("=" * 60)
-        
-        for effect in SINGLE_EFFECTS:
-            current += 1
-            print(f"\n[{current}/{total_videos}] {effect.name} ({effect.category})")
+    # Cut the audio window once for all renders; fall back to seeking in the source file.
+    # The temp directory (and the decoded clip) is removed even if a render fails.
+    with tempfile.TemporaryDirectory(prefix="demo_audio_") as clip_dir:
+        audio_path, audio_start = AUDIO_FILE, AUDIO_START_TIME
+        if work:
             try:
-                toggles = create_single_effect_toggles(effect.key)
-                generate_demo_video(effect.key, effect.name, toggles, audio_features, IMAGE_FILE, AUDIO_FILE)
-                print(f"  ✓ Saved: {effect.key}.mp4")
-            except Exception as e:
-                print(f"  ✗ Error: {e}")
-                import traceback
-                traceback.print_exc()
-    
-    # Generate videos for presets
-    if generate_presets:
-        print(f"\n{'='*60}")
-        print(f"PART 2: Curated Presets ({len(PRESETS)} videos)")
-        print("=" * 60)
-        
-        for preset in PRESETS:
-            current += 1
-            effect_list = ", ".join(preset.effects.keys())
-            print(f"\n[{current}/{total_videos}] {preset.name}")
-            print(f"  Effects: {effect_list}")
-            try:
-                toggles = create_preset_toggles(preset.effects)
-                generate_demo_video(preset.key, preset.name, toggles, audio_features, IMAGE_FILE, AUDIO_FILE)
-                print(f"  ✓ Saved: {preset.key}.mp4")
-            except Exception as e:
-                print(f"  ✗ Error: {e}")
-                import traceback
-                traceback.print_exc()
-    
-    # Generate manifest (always include all available data for reference)
+                audio_path, audio_start = extract_audio_clip(Path(clip_dir) / "clip.wav"), 0.0
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"  Could not pre-decode audio ({e}); each render will decode the MP3")
+    
+        if jobs == 1:
+            # Serial path keeps the per-frame progress bar
+            for current, (key, name, effects, is_preset) in enumerate(work, start=1):
+                print(f"\n[{current}/{to_render}] {name}")
+                print(f"  Effects: {', '.join(effects.keys())}")
+                try:
+                    toggles = create_preset_toggles(effects) if is_preset else create_single_effect_toggles(key)
+                    generate_demo_video(key, name, toggles, audio_features, IMAGE_FILE, audio_path,
+                                        encoder=encoder, audio_start=audio_start)
+                    print(f"  ✓ Saved: {key}.mp4")
+                    update_manifest()
+                except Exception as e:
+                    print(f"  ✗ Error: {e}")
+                    traceback.print_exc()
+        else:
+            # Each render is independent, so fan them out across worker processes.
+            # audio_features is shipped once per worker via the initializer, not once per task.
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(audio_features, encoder, audio_path, audio_start)) as executor:
+                futures = {executor.submit(_render_one, *item): item for item in work}
+                for current, future in enumerate(as_completed(futures), start=1):
+                    key, name = futures[future][:2]
+                    try:
+                        future.result()
+                        print(f"[{current}/{to_render}] ✓ Saved: {key}.mp4 ({name})")
+                        update_manifest()
+                    except Exception as e:
+                        print(f"[{current}/{to_render}] ✗ Error in {name}: {e}")
+                        traceback.print_exception(e)
+    
+    # Final manifest pass (also covers runs where every video was already cached)
     print(f"\nGenerating manifest.json...")
-    effects_for_manifest = SINGLE_EFFECTS if generate_effects else []
-    presets_for_manifest = PRESETS if generate_presets else []
-    manifest = generate_manifest(effects_for_manifest, presets_for_manifest)
-    manifest_path = DEMOS_OUTPUT_DIR / "manifest.json"
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
+    update_manifest()
     print(f"  ✓ Saved: manifest.json")
     
     print("\n" + "=" * 60)
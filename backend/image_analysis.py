@@ -3,23 +3,66 @@ Image Analysis Module
 Uses OpenAI's vision capabilities to analyze cover art and generate personalized effects.
 """
 
+import io
 import os
 import json
-import base64
+import asyncio
+import random
+import hashlib
+import shutil
 import httpx
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+from PIL import Image
+
+from disk_cache import CACHE_DIR, PersistentCache, atomic_write, evict_lru
 
 # Load environment variables
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
-
-
-@dataclass
+OPENAI_IMAGES_URL = "https://api.openai.com/v1/images/generations"
+VISION_MODEL = "gpt-5.2"
+SPRITE_MODEL = "gpt-image-1.5"
+# Larger images are downscaled before upload; the vision model downsamples anyway
+MAX_UPLOAD_DIMENSION = 1024
+# Images this small are sent with detail "low" (a single 512px tile, far fewer tokens)
+LOW_DETAIL_MAX_DIMENSION = 512
+
+# Image analyses are cached by image content (in memory, and as JSON on disk).
+# Bump ANALYSIS_PROMPT_VERSION whenever the prompt or parsing changes.
+ANALYSIS_PROMPT_VERSION = 2
+
+# Generated particle sprites are cached by prompt; oldest-used are evicted past the cap
+SPRITE_CACHE_DIR = CACHE_DIR / "sprites"
+_SPRITE_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); without it the shared
+# client still reuses HTTP/1.1 keep-alive connections
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# orjson parses API responses faster when installed; stdlib json otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# pybase64 is a drop-in, SIMD-accelerated replacement for the stdlib module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+
+@dataclass(slots=True, frozen=True)
 class SubjectBounds:
     """Bounding box for detected subject as percentages (0-1)."""
     x: float  # Left edge
@@ -33,7 +76,7 @@ class SubjectBounds:
         return (self.x + self.w / 2, self.y + self.h / 2)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GlowPoint:
     """A point in the image that should emit light/glow."""
     x: float  # X position (0-1)
@@ -41,7 +84,7 @@ class GlowPoint:
     intensity: float = 1.0  # Glow intensity (0-1)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ImageAnalysis:
     """Results from AI image analysis."""
     subject: str  # What the main subject is (e.g., "light bulb", "guitar")
@@ -53,7 +96,7 @@ class ImageAnalysis:
     suggested_particle_style: str  # What kind of particles would fit
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EffectSuggestion:
     """Suggested effect settings based on image and audio analysis."""
     # Element effects
@@ -78,45 +121,164 @@ class EffectSuggestion:
     background_dim: Dict[str, Any] = field(default_factory=lambda: {"enabled": True, "intensity": 0.3})
 
 
+# Default {enabled, intensity} per effect, built once from the EffectSuggestion fields
+_DEFAULT_EFFECTS = {effect.name: effect.default_factory() for effect in fields(EffectSuggestion)}
+
+
 def encode_image_to_base64(image_path: str) -> str:
     """Read an image file and encode it as base64."""
     with open(image_path, "rb") as f:
         return base64.b64encode(f.read()).decode("utf-8")
 
 
+_MIME_BY_EXT = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
 def get_image_mime_type(image_path: str) -> str:
     """Get the MIME type based on file extension."""
-    ext = Path(image_path).suffix.lower()
-    mime_types = {
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-    }
-    return mime_types.get(ext, "image/jpeg")
+    return _MIME_BY_EXT.get(os.path.splitext(image_path)[1].lower(), "image/jpeg")
+
+
+_http_client: Optional[httpx.AsyncClient] = None
 
 
-async def analyze_image(image_path: str) -> ImageAnalysis:
+def _get_client() -> httpx.AsyncClient:
     """
-    Analyze an image using OpenAI's vision capabilities.
-    
-    Args:
-        image_path: Path to the image file
+    Shared client for every OpenAI call, created on first use, so requests reuse
+    pooled connections instead of paying a TCP + TLS handshake each time.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Rate limits, server errors and timeouts are retried with exponential backoff + jitter
+# (image generation only retries errors from before the request was sent)
+_MAX_ATTEMPTS = 4
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 20.0
+_RETRY_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    """Seconds to wait before the next attempt, honoring Retry-After when the API sends it."""
+    if response is not None:
+        try:
+            return min(float(response.headers["retry-after"]), _RETRY_MAX_DELAY)
+        except (KeyError, ValueError):
+            pass
+    backoff = min(_RETRY_BASE_DELAY * 2 ** attempt, _RETRY_MAX_DELAY)
+    return random.uniform(backoff / 2, backoff)
+
+
+async def _post(
+    url: str,
+    payload: Dict[str, Any],
+    timeout: float,
+    retry_after_send: bool = True
+) -> httpx.Response:
+    """
+    POST to the OpenAI API on the shared client, retrying transient failures.
+    With retry_after_send=False, transport errors are only retried if the request
+    never reached the server (connect/pool errors); a read timeout may mean the
+    server is still doing (and billing) the work, so it is raised instead.
+    """
+    client = _get_client()
+    for attempt in range(_MAX_ATTEMPTS):
+        is_last_attempt = attempt == _MAX_ATTEMPTS - 1
+        response = None
+        try:
+            response = await client.post(
+                url,
+                timeout=timeout,
+                headers={
+                    "Authorization": f"Bearer {OPENAI_API_KEY}",
+                    "Content-Type": "application/json",
+                },
+                json=payload
+            )
+        except httpx.TransportError as exc:
+            not_sent = isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+            if is_last_attempt or not (not_sent or retry_after_send):
+                raise
+        else:
+            # An exhausted quota is also a 429, but retrying it can't succeed
+            retryable = (
+                response.status_code in _RETRY_STATUS_CODES
+                and b"insufficient_quota" not in response.content
+            )
+            if not retryable or is_last_attempt:
+                return response
         
-    Returns:
-        ImageAnalysis with detected subject, bounds, colors, etc.
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+
+# Analysis dicts keyed by _analysis_cache_key, stored as JSON on disk
+_analysis_cache = PersistentCache(
+    "image_analysis", maxsize=64, max_disk_bytes=16 * 1024 * 1024,
+    suffix=".json", dumps=lambda data: json.dumps(data).encode(), loads=json.loads
+)
+
+
+def _analysis_cache_key(image_bytes: bytes, detail: Optional[str] = None) -> str:
+    """Content hash of the image, salted with the prompt version, model and any forced detail."""
+    salt = f"{ANALYSIS_PROMPT_VERSION}:{VISION_MODEL}:" + (f"{detail}:" if detail else "")
+    digest = hashlib.blake2b(salt.encode(), digest_size=20)
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+def _prepare_upload_bytes(image_bytes: bytes, image_path: str) -> Tuple[bytes, str, str]:
     """
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY not set in environment")
+    Downscale images larger than MAX_UPLOAD_DIMENSION and re-encode them (JPEG,
+    or PNG when there is transparency). Bounds and glow points come back as
+    fractions, so they still apply to the original. Smaller images are sent as-is.
     
-    # Encode image
-    image_data = encode_image_to_base64(image_path)
+    Returns (bytes, mime type, vision detail level for the upload).
+    """
     mime_type = get_image_mime_type(image_path)
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        if max(img.size) <= MAX_UPLOAD_DIMENSION:
+            detail = "low" if max(img.size) <= LOW_DETAIL_MAX_DIMENSION else "high"
+            return image_bytes, mime_type, detail
+        
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        target_mode = "RGBA" if has_alpha else "RGB"
+        if img.mode != target_mode:
+            img = img.convert(target_mode)
+        img.thumbnail((MAX_UPLOAD_DIMENSION, MAX_UPLOAD_DIMENSION), Image.Resampling.LANCZOS)
+    except (OSError, Image.DecompressionBombError):
+        return image_bytes, mime_type, "high"
     
-    prompt = """Analyze this image for a music visualizer. Return a JSON object with these fields:
+    buffer = io.BytesIO()
+    if has_alpha:
+        img.save(buffer, format="PNG")
+        return buffer.getvalue(), "image/png", "high"
+    img.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue(), "image/jpeg", "high"
 
-{
+
+_ANALYSIS_SCHEMA = """{
     "subject": "brief name of the main subject/element (e.g., 'light bulb', 'person', 'guitar')",
     "subject_description": "more detailed description of the subject and its visual characteristics",
     "bounds": {
@@ -131,72 +293,218 @@ async def analyze_image(image_path: str) -> ImageAnalysis:
     "colors": ["#FFD700", "#1A1A2E", "#FF6B35"],  // 3-5 dominant colors as hex codes
     "mood": "warm",  // one of: warm, cool, energetic, calm, dark, bright, mysterious, playful
     "suggested_particle_style": "glowing embers"  // what kind of particles would suit this image
-}
+}"""
 
-Be precise with the bounds - they should tightly fit the main subject.
+_ANALYSIS_GUIDELINES = """Be precise with the bounds - they should tightly fit the main subject.
 Identify any light sources or bright areas for glow_points.
-Extract the most visually impactful colors.
+Extract the most visually impactful colors."""
+
+_ANALYZE_PROMPT = f"""Analyze this image for a music visualizer. Return a JSON object with these fields:
+
+{_ANALYSIS_SCHEMA}
+
+{_ANALYSIS_GUIDELINES}
 Return ONLY the JSON, no other text."""
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            OPENAI_API_URL,
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "gpt-5.2",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{mime_type};base64,{image_data}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                "max_completion_tokens": 1000,
+
+def _strict_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON schema for an object where every property is required (as strict mode expects)."""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+_ANALYSIS_JSON_SCHEMA = _strict_object({
+    "subject": {"type": "string"},
+    "subject_description": {"type": "string"},
+    "bounds": _strict_object({axis: {"type": "number"} for axis in ("x", "y", "w", "h")}),
+    "glow_points": {
+        "type": "array",
+        "items": _strict_object({key: {"type": "number"} for key in ("x", "y", "intensity")}),
+    },
+    "colors": {"type": "array", "items": {"type": "string"}},
+    "mood": {
+        "type": "string",
+        "enum": ["warm", "cool", "energetic", "calm", "dark", "bright", "mysterious", "playful"],
+    },
+    "suggested_particle_style": {"type": "string"},
+})
+
+
+def _read_image(image_path: str, detail: Optional[str]) -> Tuple[bytes, str, Optional[ImageAnalysis]]:
+    """Read an image once, returning its bytes, analysis cache key and cached analysis (if any)."""
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+    
+    cache_key = _analysis_cache_key(image_bytes, detail)
+    cached = _analysis_cache.get(cache_key)
+    return image_bytes, cache_key, image_analysis_from_dict(cached) if cached is not None else None
+
+
+async def _image_message(
+    prompt: str,
+    image_bytes: bytes,
+    image_path: str,
+    detail: Optional[str]
+) -> List[Dict[str, Any]]:
+    """
+    User message content with the prompt and the (downscaled) image as a data URL.
+    detail defaults to "low" for small images and "high" otherwise.
+    """
+    upload_bytes, mime_type, auto_detail = await asyncio.to_thread(
+        _prepare_upload_bytes, image_bytes, image_path
+    )
+    image_data = base64.b64encode(upload_bytes).decode("utf-8")
+    return [
+        {"type": "text", "text": prompt},
+        {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:{mime_type};base64,{image_data}",
+                "detail": detail or auto_detail
             }
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
-        
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
-        
-        # Parse JSON from response (handle markdown code blocks)
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-        
-        data = json.loads(content.strip())
+        }
+    ]
+
+
+async def _request_json(
+    payload: Dict[str, Any],
+    schema_name: str,
+    schema: Dict[str, Any],
+    timeout: float
+) -> Dict[str, Any]:
+    """
+    Send a chat completion request using Structured Outputs, so the reply is
+    guaranteed to be JSON matching the schema, and parse it.
+    """
+    response = await _post(
+        OPENAI_API_URL,
+        {
+            **payload,
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "schema": schema, "strict": True},
+            },
+        },
+        timeout=timeout
+    )
+    
+    if response.status_code != 200:
+        raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
+    
+    result = _json_loads(response.content)
+    message = result["choices"][0]["message"]
+    if message.get("refusal"):
+        raise Exception(f"OpenAI API refused the request: {message['refusal']}")
+    
+    return _json_loads(message["content"])
+
+
+async def analyze_image(image_path: str, detail: Optional[str] = None) -> ImageAnalysis:
+    """
+    Analyze an image using OpenAI's vision capabilities.
+    Results are cached by image content, so re-analyzing the same image
+    skips the API call.
+    
+    Args:
+        image_path: Path to the image file
+        detail: Force the vision detail level ("low" or "high"); chosen by image size if None
         
-        return ImageAnalysis(
-            subject=data["subject"],
-            subject_description=data.get("subject_description", data["subject"]),
-            bounds=SubjectBounds(
-                x=data["bounds"]["x"],
-                y=data["bounds"]["y"],
-                w=data["bounds"]["w"],
-                h=data["bounds"]["h"]
-            ),
-            glow_points=[
-                GlowPoint(x=gp["x"], y=gp["y"], intensity=gp.get("intensity", 1.0))
-                for gp in data.get("glow_points", [])
+    Returns:
+        ImageAnalysis with detected subject, bounds, colors, etc.
+    """
+    image_bytes, cache_key, cached = await asyncio.to_thread(_read_image, image_path, detail)
+    if cached is not None:
+        return cached
+    
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY not set in environment")
+    
+    data = await _request_json(
+        {
+            "model": VISION_MODEL,
+            "messages": [
+                {"role": "user", "content": await _image_message(_ANALYZE_PROMPT, image_bytes, image_path, detail)}
             ],
-            colors=data["colors"],
-            mood=data["mood"],
-            suggested_particle_style=data.get("suggested_particle_style", "sparkles")
-        )
+            "max_completion_tokens": 1000,
+        },
+        "image_analysis",
+        _ANALYSIS_JSON_SCHEMA,
+        timeout=30.0
+    )
+    
+    analysis = image_analysis_from_dict(data)
+    _analysis_cache.set(cache_key, image_analysis_to_dict(analysis))
+    return analysis
+
+
+async def analyze_images(
+    image_paths: List[str],
+    concurrency: int = 8,
+    detail: Optional[str] = None
+) -> List[ImageAnalysis]:
+    """
+    Analyze several images concurrently, with at most `concurrency` API
+    requests in flight. Cached images return without an API call.
+    
+    Args:
+        image_paths: Paths to the image files
+        concurrency: Maximum number of simultaneous analyses
+        detail: Force the vision detail level (see analyze_image)
+        
+    Returns:
+        ImageAnalysis results in the same order as image_paths
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze_one(image_path: str) -> ImageAnalysis:
+        async with semaphore:
+            return await analyze_image(image_path, detail=detail)
+    
+    return await asyncio.gather(*(analyze_one(path) for path in image_paths))
+
+
+def image_analysis_from_dict(data: Dict[str, Any]) -> ImageAnalysis:
+    """Build an ImageAnalysis from the model's JSON (or a cached image_analysis_to_dict result)."""
+    return ImageAnalysis(
+        subject=data["subject"],
+        subject_description=data.get("subject_description", data["subject"]),
+        bounds=SubjectBounds(
+            x=data["bounds"]["x"],
+            y=data["bounds"]["y"],
+            w=data["bounds"]["w"],
+            h=data["bounds"]["h"]
+        ),
+        glow_points=[
+            GlowPoint(x=gp["x"], y=gp["y"], intensity=gp.get("intensity", 1.0))
+            for gp in data.get("glow_points", [])
+        ],
+        colors=list(data["colors"]),
+        mood=data["mood"],
+        suggested_particle_style=data.get("suggested_particle_style", "sparkles")
+    )
+
+
+def _sprite_cache_path(prompt: str) -> Path:
+    digest = hashlib.blake2b(f"{SPRITE_MODEL}:".encode(), digest_size=20)
+    digest.update(prompt.encode())
+    return SPRITE_CACHE_DIR / f"{digest.hexdigest()}.png"
+
+
+_SPRITE_PROMPT_TEMPLATE = """Create a single particle sprite for a music visualizer.
+Style: {style}
+Colors: {colors}
+
+Requirements:
+- Single small particle/element, centered
+- Transparent/black background
+- Glowing, luminous appearance
+- Soft edges that fade out
+- Size: small, suitable for many copies
+- Abstract and ethereal, not photorealistic"""
 
 
 async def generate_particle_sprite(
@@ -206,6 +514,7 @@ async def generate_particle_sprite(
 ) -> str:
     """
     Generate a custom particle sprite using OpenAI's image generation.
+    Sprites are cached on disk by prompt (style + colors), so repeats are a file copy.
     
     Args:
         colors: List of hex colors to use
@@ -221,44 +530,123 @@ async def generate_particle_sprite(
     # Create color description
     color_desc = ", ".join(colors[:3]) if colors else "white, gold"
     
-    prompt = f"""Create a single particle sprite for a music visualizer.
-Style: {style}
-Colors: {color_desc}
+    prompt = _SPRITE_PROMPT_TEMPLATE.format(style=style, colors=color_desc)
+    
+    cache_path = _sprite_cache_path(prompt)
+    if cache_path.exists():
+        try:
+            os.utime(cache_path)  # mark as recently used
+            shutil.copyfile(cache_path, output_path)
+            return output_path
+        except OSError:
+            pass
+    
+    response = await _post(
+        OPENAI_IMAGES_URL,
+        {
+            "model": SPRITE_MODEL,
+            "prompt": prompt,
+            "n": 1,
+            "size": "1024x1024",
+        },
+        timeout=60.0,
+        # No idempotency key: a retried generation would be a second billed image
+        retry_after_send=False
+    )
+    
+    if response.status_code != 200:
+        raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
+    
+    result = _json_loads(response.content)
+    image_data = result["data"][0]["b64_json"]
+    
+    # Save the image
+    with open(output_path, "wb") as f:
+        f.write(base64.b64decode(image_data))
+    
+    if atomic_write(cache_path, lambda tmp_path: shutil.copyfile(output_path, tmp_path)):
+        evict_lru(SPRITE_CACHE_DIR, "*.png", _SPRITE_CACHE_MAX_BYTES)
+    
+    return output_path
 
-Requirements:
-- Single small particle/element, centered
-- Transparent/black background
-- Glowing, luminous appearance
-- Soft edges that fade out
-- Size: small, suitable for many copies
-- Abstract and ethereal, not photorealistic"""
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            "https://api.openai.com/v1/images/generations",
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "gpt-image-1.5",
-                "prompt": prompt,
-                "n": 1,
-                "size": "1024x1024",
-            }
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
-        
-        result = response.json()
-        image_data = result["data"][0]["b64_json"]
-        
-        # Save the image
-        with open(output_path, "wb") as f:
-            f.write(base64.b64decode(image_data))
-        
-        return output_path
+_AVAILABLE_EFFECTS = """AVAILABLE EFFECTS:
+1. element_glow - Subject emits pulsating light (good for light sources, faces, focal points)
+2. element_scale - Subject grows/shrinks with beat (subtle, adds life)
+3. neon_outline - Glowing edge around subject (cyberpunk, bold)
+4. echo_trail - Afterimage effect (motion, dreamy)
+5. particle_burst - Particles explode from subject on beats (energetic, celebratory)
+6. energy_trails - Glowing lines orbit subject (mystical, flowing)
+7. light_flares - Lens flare from glow points (cinematic, dramatic)
+8. glitch - RGB split, chromatic aberration (edgy, electronic)
+9. ripple_wave - Distortion waves from subject (impactful, bass-heavy)
+10. film_grain - VHS/retro texture (nostalgic, lo-fi)
+11. strobe_flash - Brief flashes on strong beats (intense, use sparingly)
+12. vignette_pulse - Dark edges pulse with rhythm (focus, atmosphere)
+13. background_dim - Darken background to make subject pop (contrast)"""
+
+_EFFECTS_SCHEMA = """{
+    "element_glow": {"enabled": true, "intensity": 0.7},
+    "element_scale": {"enabled": true, "intensity": 0.3},
+    "neon_outline": {"enabled": false, "intensity": 0.5},
+    "echo_trail": {"enabled": false, "intensity": 0.4},
+    "particle_burst": {"enabled": true, "intensity": 0.6},
+    "energy_trails": {"enabled": true, "intensity": 0.5},
+    "light_flares": {"enabled": false, "intensity": 0.3},
+    "glitch": {"enabled": false, "intensity": 0.3},
+    "ripple_wave": {"enabled": false, "intensity": 0.4},
+    "film_grain": {"enabled": false, "intensity": 0.2},
+    "strobe_flash": {"enabled": false, "intensity": 0.3},
+    "vignette_pulse": {"enabled": true, "intensity": 0.4},
+    "background_dim": {"enabled": true, "intensity": 0.3}
+}"""
+
+_EFFECTS_GUIDELINES = """Consider:
+- If image has glow points, enable light_flares and element_glow
+- High onset density = more reactive effects (particle_burst, glitch)
+- High bass = ripple_wave, strong scale
+- High highs = sparkly particles, light effects
+- Dark mood = vignette, dim background, subtle effects
+- Energetic mood = more enabled effects, higher intensities
+- Don't enable everything - be selective for a cohesive look"""
+
+_EFFECTS_JSON_SCHEMA = _strict_object({
+    effect.name: _strict_object({"enabled": {"type": "boolean"}, "intensity": {"type": "number"}})
+    for effect in fields(EffectSuggestion)
+})
+
+_ANALYZE_AND_SUGGEST_JSON_SCHEMA = _strict_object({
+    "analysis": _ANALYSIS_JSON_SCHEMA,
+    "effects": _EFFECTS_JSON_SCHEMA,
+})
+
+
+_AUDIO_METRICS_TEMPLATE = """AUDIO METRICS (raw data - interpret these yourself, don't assume BPM alone indicates energy):
+- Tempo: {tempo} BPM
+- Onset density: {onset_density:.1f} hits/sec
+- Bass energy: {average_bass:.2f} (0-1)
+- Mid energy: {average_mid:.2f} (0-1)
+- High energy: {average_high:.2f} (0-1)
+- Dynamic range: {dynamic_range:.2f}
+- Beat strength variance: {beat_strength_variance:.3f}
+- Average energy: {average_energy:.2f}"""
+
+# Used for any metric missing from the audio_metrics passed in
+_AUDIO_METRIC_DEFAULTS = {
+    "tempo": 120,
+    "onset_density": 5,
+    "average_bass": 0.5,
+    "average_mid": 0.5,
+    "average_high": 0.5,
+    "dynamic_range": 0.5,
+    "beat_strength_variance": 0.1,
+    "average_energy": 0.5,
+}
+
+
+def _audio_metrics_prompt(audio_metrics: Dict[str, float]) -> str:
+    """Audio metrics section shared by the suggestion prompts."""
+    return _AUDIO_METRICS_TEMPLATE.format_map({**_AUDIO_METRIC_DEFAULTS, **audio_metrics})
 
 
 async def auto_suggest_effects(
@@ -296,105 +684,104 @@ IMAGE ANALYSIS:
 - Dominant colors: {', '.join(image_analysis.colors)}
 - Suggested particle style: {image_analysis.suggested_particle_style}
 
-AUDIO METRICS (raw data - interpret these yourself, don't assume BPM alone indicates energy):
-- Tempo: {audio_metrics.get('tempo', 120)} BPM
-- Onset density: {audio_metrics.get('onset_density', 5):.1f} hits/sec
-- Bass energy: {audio_metrics.get('average_bass', 0.5):.2f} (0-1)
-- Mid energy: {audio_metrics.get('average_mid', 0.5):.2f} (0-1)
-- High energy: {audio_metrics.get('average_high', 0.5):.2f} (0-1)
-- Dynamic range: {audio_metrics.get('dynamic_range', 0.5):.2f}
-- Beat strength variance: {audio_metrics.get('beat_strength_variance', 0.1):.3f}
-- Average energy: {audio_metrics.get('average_energy', 0.5):.2f}
-
-AVAILABLE EFFECTS:
-1. element_glow - Subject emits pulsating light (good for light sources, faces, focal points)
-2. element_scale - Subject grows/shrinks with beat (subtle, adds life)
-3. neon_outline - Glowing edge around subject (cyberpunk, bold)
-4. echo_trail - Afterimage effect (motion, dreamy)
-5. particle_burst - Particles explode from subject on beats (energetic, celebratory)
-6. energy_trails - Glowing lines orbit subject (mystical, flowing)
-7. light_flares - Lens flare from glow points (cinematic, dramatic)
-8. glitch - RGB split, chromatic aberration (edgy, electronic)
-9. ripple_wave - Distortion waves from subject (impactful, bass-heavy)
-10. film_grain - VHS/retro texture (nostalgic, lo-fi)
-11. strobe_flash - Brief flashes on strong beats (intense, use sparingly)
-12. vignette_pulse - Dark edges pulse with rhythm (focus, atmosphere)
-13. background_dim - Darken background to make subject pop (contrast)
+{_audio_metrics_prompt(audio_metrics)}
+
+{_AVAILABLE_EFFECTS}
 
 Return a JSON object where each effect has "enabled" (boolean) and "intensity" (0.0-1.0):
 
-{{
-    "element_glow": {{"enabled": true, "intensity": 0.7}},
-    "element_scale": {{"enabled": true, "intensity": 0.3}},
-    "neon_outline": {{"enabled": false, "intensity": 0.5}},
-    "echo_trail": {{"enabled": false, "intensity": 0.4}},
-    "particle_burst": {{"enabled": true, "intensity": 0.6}},
-    "energy_trails": {{"enabled": true, "intensity": 0.5}},
-    "light_flares": {{"enabled": false, "intensity": 0.3}},
-    "glitch": {{"enabled": false, "intensity": 0.3}},
-    "ripple_wave": {{"enabled": false, "intensity": 0.4}},
-    "film_grain": {{"enabled": false, "intensity": 0.2}},
-    "strobe_flash": {{"enabled": false, "intensity": 0.3}},
-    "vignette_pulse": {{"enabled": true, "intensity": 0.4}},
-    "background_dim": {{"enabled": true, "intensity": 0.3}}
-}}
-
-Consider:
-- If image has glow points, enable light_flares and element_glow
-- High onset density = more reactive effects (particle_burst, glitch)
-- High bass = ripple_wave, strong scale
-- High highs = sparkly particles, light effects
-- Dark mood = vignette, dim background, subtle effects
-- Energetic mood = more enabled effects, higher intensities
-- Don't enable everything - be selective for a cohesive look
+{_EFFECTS_SCHEMA}
+
+{_EFFECTS_GUIDELINES}
 
 Return ONLY the JSON, no explanation."""
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            OPENAI_API_URL,
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "gpt-5.2",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "max_completion_tokens": 800,
-            }
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
-        
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
-        
-        # Parse JSON from response
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-        
-        data = json.loads(content.strip())
+    data = await _request_json(
+        {
+            "model": VISION_MODEL,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "max_completion_tokens": 800,
+        },
+        "effect_suggestion",
+        _EFFECTS_JSON_SCHEMA,
+        timeout=30.0
+    )
+    
+    return effect_suggestion_from_dict(data)
+
+
+async def analyze_and_suggest(
+    image_path: str,
+    audio_metrics: Dict[str, float],
+    detail: Optional[str] = None
+) -> Tuple[ImageAnalysis, EffectSuggestion]:
+    """
+    Analyze an image and suggest effect settings in a single API call.
+    If the image analysis is already cached, only the suggestion is requested.
+    
+    Args:
+        image_path: Path to the image file
+        audio_metrics: Raw audio metrics dict (see auto_suggest_effects)
+        detail: Force the vision detail level (see analyze_image)
         
-        return EffectSuggestion(
-            element_glow=data.get("element_glow", {"enabled": True, "intensity": 0.5}),
-            element_scale=data.get("element_scale", {"enabled": True, "intensity": 0.3}),
-            neon_outline=data.get("neon_outline", {"enabled": False, "intensity": 0.5}),
-            echo_trail=data.get("echo_trail", {"enabled": False, "intensity": 0.4}),
-            particle_burst=data.get("particle_burst", {"enabled": True, "intensity": 0.5}),
-            energy_trails=data.get("energy_trails", {"enabled": False, "intensity": 0.4}),
-            light_flares=data.get("light_flares", {"enabled": False, "intensity": 0.3}),
-            glitch=data.get("glitch", {"enabled": False, "intensity": 0.3}),
-            ripple_wave=data.get("ripple_wave", {"enabled": False, "intensity": 0.4}),
-            film_grain=data.get("film_grain", {"enabled": False, "intensity": 0.2}),
-            strobe_flash=data.get("strobe_flash", {"enabled": False, "intensity": 0.3}),
-            vignette_pulse=data.get("vignette_pulse", {"enabled": True, "intensity": 0.4}),
-            background_dim=data.get("background_dim", {"enabled": True, "intensity": 0.3})
-        )
+    Returns:
+        (ImageAnalysis, EffectSuggestion)
+    """
+    image_bytes, cache_key, cached = await asyncio.to_thread(_read_image, image_path, detail)
+    if cached is not None:
+        return cached, await auto_suggest_effects(cached, audio_metrics)
+    
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY not set in environment")
+    
+    prompt = f"""You are an expert music visualizer designer. Analyze this image (the cover art for a song), then, based on the image and the audio characteristics below, suggest which visual effects to enable and at what intensity.
+
+{_audio_metrics_prompt(audio_metrics)}
+
+{_AVAILABLE_EFFECTS}
+
+Return a JSON object with two keys, "analysis" and "effects".
+
+"analysis" describes the image, with these fields:
+
+{_ANALYSIS_SCHEMA}
+
+{_ANALYSIS_GUIDELINES}
+
+"effects" holds the suggested settings, where each effect has "enabled" (boolean) and "intensity" (0.0-1.0):
+
+{_EFFECTS_SCHEMA}
+
+{_EFFECTS_GUIDELINES}
+
+Return ONLY the JSON, no explanation."""
+
+    data = await _request_json(
+        {
+            "model": VISION_MODEL,
+            "messages": [
+                {"role": "user", "content": await _image_message(prompt, image_bytes, image_path, detail)}
+            ],
+            "max_completion_tokens": 1800,
+        },
+        "image_analysis_and_effects",
+        _ANALYZE_AND_SUGGEST_JSON_SCHEMA,
+        timeout=60.0
+    )
+    
+    analysis = image_analysis_from_dict(data["analysis"])
+    _analysis_cache.set(cache_key, image_analysis_to_dict(analysis))
+    return analysis, effect_suggestion_from_dict(data["effects"])
+
+
+def effect_suggestion_from_dict(data: Dict[str, Any]) -> EffectSuggestion:
+    """Build an EffectSuggestion from the model's JSON, defaulting any missing effect."""
+    return EffectSuggestion(**{
+        name: data[name] if name in data else dict(default)
+        for name, default in _DEFAULT_EFFECTS.items()
+    })
 
 
 def image_analysis_to_dict(analysis: ImageAnalysis) -> Dict[str, Any]:
@@ -412,7 +799,7 @@ def image_analysis_to_dict(analysis: ImageAnalysis) -> Dict[str, Any]:
             {"x": gp.x, "y": gp.y, "intensity": gp.intensity}
             for gp in analysis.glow_points
         ],
-        "colors": analysis.colors,
+        "colors": list(analysis.colors),
         "mood": analysis.mood,
         "suggested_particle_style": analysis.suggested_particle_style
     }
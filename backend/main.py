@@ -20,11 +20,14 @@ from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from audio_analysis import analyze_audio, get_waveform_data, get_audio_duration, AudioFeatures
+from audio_analysis import (
+    analyze_audio, get_waveform_data, get_audio_duration, AudioFeatures,
+    FEATURE_BEATS, FEATURE_ONSETS, FEATURE_ENERGY
+)
 from effect_engine import (
     EffectToggles, EffectToggle, ImageContext, SubjectBounds, GlowPoint,
     calculate_effect_parameters, toggles_from_dict, image_context_from_dict,
-    legacy_settings_to_toggles
+    legacy_settings_to_toggles, required_audio_features
 )
 from video_renderer import render_video, RenderSettings, AspectRatio
 
@@ -66,6 +69,10 @@ session_lock = threading.Lock()
 SESSION_EXPIRY_SECONDS = 3600  # 1 hour
 SESSION_CLEANUP_INTERVAL = 300  # Check every 5 minutes
 
+# Analysis stages behind the audio_info generate_playbook_v2 reports
+# (tempo, beat count, onset density, average energy)
+PLAYBOOK_AUDIO_FEATURES = frozenset({FEATURE_BEATS, FEATURE_ONSETS, FEATURE_ENERGY})
+
 
 def cleanup_expired_sessions():
     """Remove sessions that haven't been accessed in SESSION_EXPIRY_SECONDS."""
@@ -122,6 +129,14 @@ async def startup_event():
     asyncio.create_task(session_cleanup_task())
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared OpenAI HTTP client."""
+    from image_analysis import close_http_client
+    
+    await close_http_client()
+
+
 # ============================================================================
 # Pydantic Models
 # ============================================================================
@@ -442,8 +457,8 @@ async def get_audio_analysis(session_id: str):
         "tempo": features.tempo,
         "duration": features.duration,
         "beat_count": len(features.beat_times),
-        "beat_times": features.beat_times,
-        "beat_strengths": features.beat_strengths,
+        "beat_times": features.beat_times.tolist(),
+        "beat_strengths": features.beat_strengths.tolist(),
         # New metrics for AI interpretation
         "onset_density": features.onset_density,
         "average_bass": features.average_bass,
@@ -557,17 +572,13 @@ async def auto_suggest_endpoint(session_id: str):
         )
     
     try:
-        # Analyze image if not already done
-        if not session.image_analysis:
-            from image_analysis import analyze_image, image_analysis_to_dict
-            analysis = await analyze_image(session.image_path)
-            session.image_analysis = image_analysis_to_dict(analysis)
-        
-        # Get audio metrics
         start = session.start_time
         duration = (session.end_time or 30.0) - start
-        features = analyze_audio(session.audio_path, start_time=start, duration=duration)
+        features = await asyncio.to_thread(
+            analyze_audio, session.audio_path, start_time=start, duration=duration
+        )
         
+        # Get audio metrics
         audio_metrics = {
             "tempo": features.tempo,
             "onset_density": features.onset_density,
@@ -581,31 +592,38 @@ async def auto_suggest_endpoint(session_id: str):
         
         # Get AI suggestions
         from image_analysis import (
-            auto_suggest_effects, effect_suggestion_to_dict,
-            ImageAnalysis, SubjectBounds as IASubjectBounds, GlowPoint as IAGlowPoint
+            analyze_and_suggest, auto_suggest_effects, effect_suggestion_to_dict,
+            image_analysis_to_dict, ImageAnalysis,
+            SubjectBounds as IASubjectBounds, GlowPoint as IAGlowPoint
         )
         
-        # Reconstruct ImageAnalysis from dict
-        analysis_dict = session.image_analysis
-        image_analysis = ImageAnalysis(
-            subject=analysis_dict.get("subject", "subject"),
-            subject_description=analysis_dict.get("subject_description", ""),
-            bounds=IASubjectBounds(
-                x=analysis_dict.get("bounds", {}).get("x", 0.25),
-                y=analysis_dict.get("bounds", {}).get("y", 0.25),
-                w=analysis_dict.get("bounds", {}).get("w", 0.5),
-                h=analysis_dict.get("bounds", {}).get("h", 0.5)
-            ),
-            glow_points=[
-                IAGlowPoint(x=gp["x"], y=gp["y"], intensity=gp.get("intensity", 1.0))
-                for gp in analysis_dict.get("glow_points", [])
-            ],
-            colors=analysis_dict.get("colors", []),
-            mood=analysis_dict.get("mood", "neutral"),
-            suggested_particle_style=analysis_dict.get("suggested_particle_style", "sparkles")
-        )
+        if not session.image_analysis:
+            # Image not analyzed yet: one API call returns both the analysis and the suggestions
+            analysis, suggestion = await analyze_and_suggest(session.image_path, audio_metrics)
+            session.image_analysis = image_analysis_to_dict(analysis)
+        else:
+            # Reconstruct ImageAnalysis from dict
+            analysis_dict = session.image_analysis
+            image_analysis = ImageAnalysis(
+                subject=analysis_dict.get("subject", "subject"),
+                subject_description=analysis_dict.get("subject_description", ""),
+                bounds=IASubjectBounds(
+                    x=analysis_dict.get("bounds", {}).get("x", 0.25),
+                    y=analysis_dict.get("bounds", {}).get("y", 0.25),
+                    w=analysis_dict.get("bounds", {}).get("w", 0.5),
+                    h=analysis_dict.get("bounds", {}).get("h", 0.5)
+                ),
+                glow_points=[
+                    IAGlowPoint(x=gp["x"], y=gp["y"], intensity=gp.get("intensity", 1.0))
+                    for gp in analysis_dict.get("glow_points", [])
+                ],
+                colors=analysis_dict.get("colors", []),
+                mood=analysis_dict.get("mood", "neutral"),
+                suggested_particle_style=analysis_dict.get("suggested_particle_style", "sparkles")
+            )
+            
+            suggestion = await auto_suggest_effects(image_analysis, audio_metrics)
         
-        suggestion = await auto_suggest_effects(image_analysis, audio_metrics)
         suggestion_dict = effect_suggestion_to_dict(suggestion)
         
         # Store in session
@@ -652,11 +670,6 @@ def render_video_task(session_id: str, settings: GenerateRequest):
             session_image_analysis = session.image_analysis
             particle_sprite_path = session.particle_sprite_path
         
-        # Analyze audio (outside lock - this is slow)
-        start = settings.start_time
-        duration = (settings.end_time or 30.0) - start
-        features = analyze_audio(audio_path, start_time=start, duration=duration)
-        
         # Determine which toggle system to use
         if settings.effect_toggles:
             # New toggle-based system
@@ -675,6 +688,15 @@ def render_video_task(session_id: str, settings: GenerateRequest):
             # Default toggles
             toggles = EffectToggles()
         
+        # Analyze audio (outside lock - this is slow), skipping stages that neither
+        # an enabled effect nor the playbook uses
+        start = settings.start_time
+        duration = (settings.end_time or 30.0) - start
+        features = analyze_audio(
+            audio_path, start_time=start, duration=duration,
+            required=required_audio_features(toggles) | PLAYBOOK_AUDIO_FEATURES
+        )
+        
         # Build image context if analysis exists
         image_context = None
         if session_image_analysis:
@@ -886,10 +908,6 @@ def export_video_task(session_id: str, quality: str):
             energy_level = session.energy_level
             particle_sprite_path = session.particle_sprite_path
         
-        # Analyze audio (outside lock - this is slow)
-        duration = (end_time or 30.0) - start
-        features = analyze_audio(audio_path, start_time=start, duration=duration)
-        
         # Get toggles
         if session_effect_toggles:
             toggles = toggles_from_dict(session_effect_toggles)
@@ -900,6 +918,14 @@ def export_video_task(session_id: str, quality: str):
                 energy_level / 100.0
             )
         
+        # Analyze audio (outside lock - this is slow). Same stages as the render task,
+        # so an export after a preview render reuses its cached analysis
+        duration = (end_time or 30.0) - start
+        features = analyze_audio(
+            audio_path, start_time=start, duration=duration,
+            required=required_audio_features(toggles) | PLAYBOOK_AUDIO_FEATURES
+        )
+        
         # Build image context
         image_context = None
         if session_image_analysis:
@@ -10,13 +10,17 @@ import subprocess
 import tempfile
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Optional, List, Tuple, Dict, Any
+from typing import Callable, Optional, List, Tuple, Dict
 
 from PIL import Image, ImageFilter, ImageEnhance, ImageDraw
 import numpy as np
 
-from effect_engine import EffectParameters, get_effect_value_at_time
+from effect_engine import (
+    EffectParameters, EnergyTrailsParams, RippleWaveParams,
+    compute_effect_timeline, get_effect_value_at_time
+)
 
 
 class AspectRatio(Enum):
@@ -48,6 +52,54 @@ class RenderSettings:
     quality: str = "medium"
     duration: float = 30.0
     preview: bool = False
+    encoder: str = "libx264"  # libx264, h264_nvenc, hevc_nvenc, h264_videotoolbox, or "auto"
+
+
+# Hardware H.264 encoders tried (in order) when RenderSettings.encoder is "auto"
+AUTO_ENCODERS = ("h264_nvenc", "h264_videotoolbox")
+
+
+@lru_cache(maxsize=None)
+def encoder_available(encoder: str) -> bool:
+    """
+    Check whether FFmpeg can actually open an encoder by encoding a tiny test clip.
+    Being listed in `ffmpeg -encoders` isn't enough: NVENC builds fail without a GPU/driver.
+    """
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+        "-c:v", encoder, "-f", "null", "-"
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0
+
+
+def resolve_encoder(encoder: str) -> str:
+    """Map "auto" to the first working hardware encoder, falling back to libx264."""
+    if encoder != "auto":
+        return encoder
+    for candidate in AUTO_ENCODERS:
+        if encoder_available(candidate):
+            return candidate
+    return "libx264"
+
+
+def encoder_args(encoder: str, crf: int, preview: bool) -> List[str]:
+    """FFmpeg video codec arguments for an encoder at a libx264-style CRF quality level."""
+    if encoder.endswith("_nvenc"):
+        args = ["-c:v", encoder, "-preset", "p1" if preview else "p6",
+                "-rc", "vbr", "-cq", str(crf), "-b:v", "0"]
+    elif encoder.endswith("_videotoolbox"):
+        # VideoToolbox quality is 1-100 (higher is better): CRF 18/23/28 -> 70/60/50
+        args = ["-c:v", encoder, "-q:v", str(106 - 2 * crf)]
+    else:
+        args = ["-c:v", encoder, "-preset", "ultrafast" if preview else "slow", "-crf", str(crf)]
+    if encoder.startswith("hevc"):
+        args += ["-tag:v", "hvc1"]  # Lets QuickTime/Safari play HEVC in MP4
+    return args
 
 
 @dataclass
@@ -214,6 +266,30 @@ def render_video(
     # Store echo trail frames
     echo_frames: List[Image.Image] = []
     
+    # Scalar effect signals for every frame, computed up front in a few array passes
+    timeline = compute_effect_timeline(effect_params, fps, total_frames)
+    
+    # Per-effect settings that stay constant for the whole video
+    glow = effect_params.element_glow
+    outline = effect_params.neon_outline
+    echo = effect_params.echo_trail
+    burst = effect_params.particle_burst
+    trails = effect_params.energy_trails
+    flares = effect_params.light_flares
+    ripple = effect_params.ripple_wave
+    grain = effect_params.film_grain
+    strobe = effect_params.strobe_flash
+    bg_dim = effect_params.background_dim
+    subject = effect_params.subject_bounds
+    bounds = {
+        "x": subject.x,
+        "y": subject.y,
+        "w": subject.w,
+        "h": subject.h,
+        "center_x": subject.center_x,
+        "center_y": subject.center_y
+    }
+    
     with tempfile.TemporaryDirectory() as temp_dir:
         frame_pattern = os.path.join(temp_dir, "frame_%06d.png")
         
@@ -222,8 +298,7 @@ def render_video(
             dt = 1.0 / fps
             
             # Get effect values at this time
-            effects = get_effect_value_at_time(effect_params, time)
-            bounds = effects.get("subject_bounds", {})
+            effects = get_effect_value_at_time(effect_params, time, timeline, frame_num)
             
             # Start with base image
             frame = base_image.copy()
@@ -231,56 +306,54 @@ def render_video(
             # ================================================================
             # LAYER 1: BACKGROUND WITH DIM AND BLUR
             # ================================================================
-            if effects.get("background_dim_enabled", False):
+            if bg_dim.enabled:
                 frame = apply_background_dim(
                     frame, bounds, 
-                    effects.get("background_dim_amount", 0),
-                    effects.get("background_blur", 0),
+                    bg_dim.dim_amount,
+                    bg_dim.blur_amount,
                     width, height
                 )
             
             # ================================================================
             # LAYER 2: RIPPLE WAVE DISTORTION
             # ================================================================
-            ripples = effects.get("ripple_waves", [])
-            if ripples:
-                for ripple in ripples:
-                    frame = apply_ripple_wave(
-                        frame, ripple, width, height,
-                        effects.get("ripple_intensity", 0.5)
-                    )
+            for ripple_radius, ripple_amplitude in zip(effects.ripple_radii.tolist(), effects.ripple_amplitudes.tolist()):
+                frame = apply_ripple_wave(
+                    frame, ripple_radius, ripple_amplitude, ripple,
+                    width, height, ripple.intensity
+                )
             
             # ================================================================
             # LAYER 3: ELEMENT SCALE
             # ================================================================
-            scale = effects.get("element_scale", 1.0)
+            scale = effects.element_scale
             if abs(scale - 1.0) > 0.001:
                 frame = apply_element_scale(frame, bounds, scale, width, height, resampling)
             
             # ================================================================
             # LAYER 4: ELEMENT GLOW
             # ================================================================
-            glow_intensity = effects.get("element_glow_intensity", 0)
+            glow_intensity = effects.element_glow_intensity
             if glow_intensity > 0.01:
                 frame = apply_element_glow(
                     frame, bounds,
                     glow_intensity,
-                    effects.get("element_glow_radius", 50),
-                    effects.get("element_glow_color", (255, 200, 100)),
+                    glow.radius,
+                    glow.color,
                     width, height
                 )
             
             # ================================================================
             # LAYER 5: NEON OUTLINE
             # ================================================================
-            outline_intensity = effects.get("neon_outline_intensity", 0)
+            outline_intensity = effects.neon_outline_intensity
             if outline_intensity > 0.01:
                 frame = apply_neon_outline(
                     frame, bounds,
                     outline_intensity,
-                    effects.get("neon_outline_color", (0, 255, 255)),
-                    effects.get("neon_outline_width", 3),
-                    effects.get("neon_outline_glow", 10),
+                    outline.color,
+                    outline.width,
+                    outline.glow_radius,
                     width, height
                 )
             
@@ -288,9 +361,9 @@ def render_video(
             # LAYER 6: ECHO TRAIL
             # ================================================================
             # Store frame BEFORE applying echo (so we echo clean frames, not echoes of echoes)
-            if effects.get("echo_trail_enabled", False):
+            if echo.enabled:
                 echo_frames.append(frame.copy())
-                max_frames = effects.get("echo_trail_count", 5) + 2
+                max_frames = echo.trail_count + 2
                 if len(echo_frames) > max_frames:
                     echo_frames.pop(0)
             elif echo_frames:
@@ -298,35 +371,33 @@ def render_video(
                 echo_frames.clear()
             
             # Now apply the echo trail effect
-            if effects.get("echo_trail_enabled", False):
+            if echo.enabled:
                 frame = apply_echo_trail(
                     frame, echo_frames[:-1],  # Exclude current frame from echoes
-                    effects.get("echo_trail_count", 5),
-                    effects.get("echo_trail_decay", 0.7),
-                    effects.get("echo_trail_intensity", 0.5)
+                    echo.trail_count,
+                    echo.opacity_decay,
+                    echo.intensity
                 )
             
             # ================================================================
             # LAYER 7: PARTICLE BURST
             # ================================================================
-            bursts = effects.get("particle_bursts", [])
-            burst_params = effects.get("particle_burst_params", {})
-            
             # Spawn new bursts from subject perimeter
-            for i, burst in enumerate(bursts):
-                burst_id = (burst.get("bounds_x", 0.25), burst.get("bounds_y", 0.25), i)
-                if burst.get("progress", 0) < 0.1 and burst_id not in previous_bursts:
+            for i, progress in enumerate(effects.particle_burst_progress.tolist()):
+                burst_id = (burst.bounds_x, burst.bounds_y, i)
+                if progress < 0.1 and burst_id not in previous_bursts:
                     previous_bursts.add(burst_id)
                     particle_system.spawn_burst_from_bounds(
-                        bounds_x=burst.get("bounds_x", 0.25),
-                        bounds_y=burst.get("bounds_y", 0.25),
-                        bounds_w=burst.get("bounds_w", 0.5),
-                        bounds_h=burst.get("bounds_h", 0.5),
-                        count=burst_params.get("count", 50),
-                        colors=burst_params.get("colors", [(255, 255, 255), (255, 220, 180), (200, 220, 255)]),
-                        size_range=burst_params.get("size_range", (3, 12)),
-                        speed=burst_params.get("speed", 200),
-                        lifetime=burst_params.get("lifetime", 1.0),
+                        bounds_x=burst.bounds_x,
+                        bounds_y=burst.bounds_y,
+                        bounds_w=burst.bounds_w,
+                        bounds_h=burst.bounds_h,
+                        count=burst.particle_count,
+                        colors=burst.colors,
+                        size_range=burst.size_range,
+                        speed=burst.speed,
+                        # Spawned particles live a fixed 1s; burst.lifetime is the trigger window
+                        lifetime=1.0,
                         time=time,
                         width=width,
                         height=height
@@ -343,65 +414,61 @@ def render_video(
             # ================================================================
             # LAYER 8: ENERGY TRAILS
             # ================================================================
-            if effects.get("energy_trails_enabled", False):
-                frame = apply_energy_trails(
-                    frame,
-                    effects.get("energy_trails_params", {}),
-                    width, height
-                )
+            if trails.enabled:
+                frame = apply_energy_trails(frame, trails, time, width, height)
             
             # ================================================================
             # LAYER 9: LIGHT FLARES
             # ================================================================
-            flare_intensity = effects.get("light_flares_intensity", 0)
+            flare_intensity = effects.light_flares_intensity
             if flare_intensity > 0.01:
                 frame = apply_light_flares(
                     frame,
-                    effects.get("light_flares_points", []),
+                    flares.flare_points,
                     flare_intensity,
-                    effects.get("light_flares_size", 100),
-                    effects.get("light_flares_colors", [(255, 255, 200)]),
+                    flares.size,
+                    flares.colors,
                     width, height
                 )
             
             # ================================================================
             # LAYER 10: GLITCH
             # ================================================================
-            if effects.get("glitch_active", False):
+            if effects.glitch_active:
                 frame = apply_glitch(
                     frame,
-                    effects.get("glitch_intensity", 0),
-                    effects.get("glitch_chromatic", 0),
-                    effects.get("glitch_rgb_split", 0),
-                    effects.get("glitch_scan_lines", False),
-                    effects.get("glitch_scan_opacity", 0),
-                    effects.get("glitch_slice", False)
+                    effects.glitch_intensity,
+                    effects.glitch_chromatic,
+                    effects.glitch_rgb_split,
+                    effects.glitch_scan_lines,
+                    effects.glitch_scan_opacity,
+                    effects.glitch_slice
                 )
             
             # ================================================================
             # LAYER 11: FILM GRAIN
             # ================================================================
-            if effects.get("film_grain_enabled", False):
+            if grain.enabled:
                 frame = apply_film_grain(
                     frame,
-                    effects.get("film_grain_intensity", 0.2),
-                    effects.get("film_grain_size", 1.5)
+                    grain.intensity,
+                    grain.grain_size
                 )
             
             # ================================================================
             # LAYER 12: STROBE FLASH
             # ================================================================
-            if effects.get("strobe_active", False):
+            if effects.strobe_active:
                 frame = apply_strobe_flash(
                     frame,
-                    effects.get("strobe_intensity", 0.5),
-                    effects.get("strobe_color", (255, 255, 255))
+                    effects.strobe_intensity,
+                    strobe.color
                 )
             
             # ================================================================
             # LAYER 13: VIGNETTE
             # ================================================================
-            vignette_strength = effects.get("vignette_strength", 0)
+            vignette_strength = effects.vignette_strength
             if vignette_strength > 0.01:
                 frame = apply_vignette(frame, vignette_strength, width, height)
             
@@ -419,21 +486,18 @@ def render_video(
         
         if render_settings.preview:
             crf = 28
-            preset = "ultrafast"
         else:
             crf = {"low": 28, "medium": 23, "high": 18}.get(render_settings.quality, 23)
-            preset = "slow"
+        encoder = resolve_encoder(render_settings.encoder)
         
         cmd = [
-            "ffmpeg", "-y",
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-nostats",
             "-framerate", str(fps),
             "-i", frame_pattern,
             "-ss", str(audio_start),
             "-t", str(duration),
             "-i", audio_path,
-            "-c:v", "libx264",
-            "-preset", preset,
-            "-crf", str(crf),
+            *encoder_args(encoder, crf, render_settings.preview),
             "-pix_fmt", "yuv420p",
             "-c:a", "aac",
             "-b:a", "192k",
@@ -524,21 +588,24 @@ def apply_background_dim(
     return Image.composite(image, bg, mask)
 
 
-def apply_ripple_wave(
-    image: Image.Image,
-    ripple: Dict[str, Any],
+# Frame-constant ripple geometry, keyed by (width, height, bounds). A render uses a single
+# key, so only the latest entry is kept (each is several full-frame float arrays).
+_ripple_geometry_cache: Dict[Tuple[int, int, float, float, float, float], Tuple[np.ndarray, ...]] = {}
+
+
+def _get_ripple_geometry(
     width: int, height: int,
-    intensity: float
-) -> Image.Image:
-    """Apply elliptical ripple wave distortion originating from subject bounds."""
-    if intensity < 0.01:
-        return image
-    
-    # Get bounds for elliptical ripple origin
-    bounds_x = ripple.get("bounds_x", 0.25)
-    bounds_y = ripple.get("bounds_y", 0.25)
-    bounds_w = ripple.get("bounds_w", 0.5)
-    bounds_h = ripple.get("bounds_h", 0.5)
+    bounds_x: float, bounds_y: float, bounds_w: float, bounds_h: float
+) -> Tuple[np.ndarray, ...]:
+    """
+    Per-pixel (x, y, distance from the subject ellipse edge, cos and sin of the outward
+    angle) for ripples around the subject bounds. Only the ripple radius changes between
+    frames, so the sqrt/arctan2/cos/sin passes run once per render instead of per wave.
+    """
+    key = (width, height, bounds_x, bounds_y, bounds_w, bounds_h)
+    geometry = _ripple_geometry_cache.get(key)
+    if geometry is not None:
+        return geometry
     
     # Center of the ellipse in pixels
     center_x = (bounds_x + bounds_w / 2) * width
@@ -548,16 +615,6 @@ def apply_ripple_wave(
     radius_x = (bounds_w / 2) * width
     radius_y = (bounds_h / 2) * height
     
-    ripple_radius = ripple.get("radius", 100)  # How far the ripple has expanded
-    amplitude = ripple.get("amplitude", 10) * intensity
-    wavelength = ripple.get("wavelength", 50)
-    
-    if amplitude < 1:
-        return image
-    
-    # Convert to numpy for faster processing
-    img_array = np.array(image)
-    
     # Create coordinate grids
     y_coords, x_coords = np.mgrid[0:height, 0:width].astype(np.float32)
     
@@ -575,27 +632,58 @@ def apply_ripple_wave(
     # Angle for displacement direction
     angle = np.arctan2(y_coords - center_y, x_coords - center_x)
     
+    geometry = (x_coords, y_coords, dist_from_edge, np.cos(angle), np.sin(angle))
+    for array in geometry:
+        array.flags.writeable = False
+    _ripple_geometry_cache.clear()
+    _ripple_geometry_cache[key] = geometry
+    return geometry
+
+
+def apply_ripple_wave(
+    image: Image.Image,
+    ripple_radius: float,
+    ripple_amplitude: float,
+    ripple: RippleWaveParams,
+    width: int, height: int,
+    intensity: float
+) -> Image.Image:
+    """Apply elliptical ripple wave distortion originating from subject bounds."""
+    if intensity < 0.01:
+        return image
+    
+    # ripple_radius is how far the ripple has expanded
+    amplitude = ripple_amplitude * intensity
+    wavelength = ripple.wavelength
+    
+    if amplitude < 1:
+        return image
+    
+    x_coords, y_coords, dist_from_edge, cos_angle, sin_angle = _get_ripple_geometry(
+        width, height, ripple.bounds_x, ripple.bounds_y, ripple.bounds_w, ripple.bounds_h
+    )
+    
     # Create mask for affected pixels (ripple expands outward from ellipse edge)
     affected_mask = (dist_from_edge >= 0) & (np.abs(dist_from_edge - ripple_radius) < wavelength * 2)
     
-    # Calculate displacement for all pixels (vectorized)
-    wave = np.sin((dist_from_edge - ripple_radius) * 2 * np.pi / wavelength)
-    gaussian_falloff = np.exp(-((dist_from_edge - ripple_radius) / wavelength) ** 2)
+    # Displacement is zero outside the ring, so only evaluate the wave on affected pixels
+    offset = dist_from_edge[affected_mask] - ripple_radius
+    wave = np.sin(offset * 2 * np.pi / wavelength)
+    gaussian_falloff = np.exp(-(offset / wavelength) ** 2)
     displacement = wave * amplitude * gaussian_falloff
     
-    # Apply displacement only where affected
-    displacement = np.where(affected_mask, displacement, 0)
-    
     # Calculate source coordinates
-    src_x = (x_coords + np.cos(angle) * displacement).astype(np.int32)
-    src_y = (y_coords + np.sin(angle) * displacement).astype(np.int32)
+    src_x = (x_coords[affected_mask] + cos_angle[affected_mask] * displacement).astype(np.int32)
+    src_y = (y_coords[affected_mask] + sin_angle[affected_mask] * displacement).astype(np.int32)
     
     # Clamp to valid range
     src_x = np.clip(src_x, 0, width - 1)
     src_y = np.clip(src_y, 0, height - 1)
     
-    # Sample from source image using advanced indexing
-    result = img_array[src_y, src_x]
+    # Sample displaced pixels from the source image; the rest map to themselves
+    img_array = np.array(image)
+    result = img_array.copy()
+    result[affected_mask] = img_array[src_y, src_x]
     
     return Image.fromarray(result.astype('uint8'), mode=image.mode)
 
@@ -859,30 +947,34 @@ def apply_echo_trail(
     return result
 
 
+# Energy trail arc: 20 points spanning 0.3 radians behind the head, radius fading
+# to 70% along the arc
+_TRAIL_ARC_LENGTH = 0.3  # Radians
+_TRAIL_ARC_OFFSETS = np.linspace(0, _TRAIL_ARC_LENGTH, 20)
+_TRAIL_ARC_FADE = 1 - _TRAIL_ARC_OFFSETS / _TRAIL_ARC_LENGTH * 0.3
+
+
 def apply_energy_trails(
     image: Image.Image,
-    params: Dict[str, Any],
+    params: EnergyTrailsParams,
+    time: float,
     width: int, height: int
 ) -> Image.Image:
     """Draw energy trails orbiting the element in an ellipse matching subject bounds."""
-    if not params:
-        return image
-    
     overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
     draw = ImageDraw.Draw(overlay)
     
-    count = params.get("count", 8)
-    colors = params.get("colors", [(255, 200, 100)])
-    trail_width = params.get("width", 2)
-    speed = params.get("speed", 1.0)
-    time = params.get("time", 0)
-    intensity = params.get("intensity", 0.5)
+    count = params.trail_count
+    colors = params.colors
+    trail_width = params.width
+    speed = params.speed
+    intensity = params.intensity
     
     # Get bounds and calculate elliptical orbit
-    bounds_x = params.get("bounds_x", 0.25)
-    bounds_y = params.get("bounds_y", 0.25)
-    bounds_w = params.get("bounds_w", 0.5)
-    bounds_h = params.get("bounds_h", 0.5)
+    bounds_x = params.bounds_x
+    bounds_y = params.bounds_y
+    bounds_w = params.bounds_w
+    bounds_h = params.bounds_h
     
     # Center of the ellipse
     center_x = (bounds_x + bounds_w / 2) * width
@@ -892,26 +984,22 @@ def apply_energy_trails(
     orbit_radius_x = (bounds_w / 2) * width * 1.3
     orbit_radius_y = (bounds_h / 2) * height * 1.3
     
+    # Orbit phase is shared by every trail; the arc radii are fixed for the video
+    orbit_phase = time * speed * 2 * math.pi
+    arc_rx = orbit_radius_x * _TRAIL_ARC_FADE
+    arc_ry = orbit_radius_y * _TRAIL_ARC_FADE
+    
     for i in range(count):
         base_angle = (i / count) * 2 * math.pi
-        angle = base_angle + time * speed * 2 * math.pi
+        angle = base_angle + orbit_phase
         
         # Calculate trail positions
         color = colors[i % len(colors)]
         alpha = int(intensity * 200)
         
-        # Draw trail as arc following ellipse
-        trail_length = 0.3  # Radians
-        points = []
-        for t in np.linspace(0, trail_length, 20):
-            a = angle - t
-            # Fade radius as trail extends
-            fade_factor = (1 - t / trail_length * 0.3)
-            rx = orbit_radius_x * fade_factor
-            ry = orbit_radius_y * fade_factor
-            px = center_x + math.cos(a) * rx
-            py = center_y + math.sin(a) * ry
-            points.append((px, py))
+        # Draw trail as arc following ellipse (all 20 points in one array pass)
+        a = angle - _TRAIL_ARC_OFFSETS
+        points = list(zip((center_x + np.cos(a) * arc_rx).tolist(), (center_y + np.sin(a) * arc_ry).tolist()))
         
         # Draw with fading alpha
         for j in range(len(points) - 1):